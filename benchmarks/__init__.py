@@ -0,0 +1,4 @@
+"""Benchmarks for the ChoraleBricks package.
+
+Run from the repository root, e.g. `python -m benchmarks.songdb_construction`.
+"""
@@ -0,0 +1,67 @@
+"""
+    Throughput and peak memory of loading and mixing all tracks per sample data type.
+
+    Uses the dataset at `CHORALEDB_PATH` if set, otherwise a synthetic dataset.
+    Each data type runs in a fresh process, memory is reported as increase of the peak RSS.
+"""
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from pathlib import Path
+
+from choralebricks.dataset import EnsembleRandom, MixerSimple, SongDB
+
+from .synthetic import make_synthetic_db
+
+
+def run(root_dir, dtype, queue):
+    cbdb = SongDB(root_dir)
+    tracks = [cur_track for cur_song in cbdb.songs for cur_track in cur_song.tracks]
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # load every track of the dataset once
+    num_bytes = 0
+    num_frames = 0
+    start = time.perf_counter()
+    for cur_track in tracks:
+        cur_audio = cur_track.audio(dtype=dtype)
+        num_bytes += cur_audio.nbytes
+        num_frames += cur_audio.shape[0]
+    dur_load = time.perf_counter() - start
+
+    # mix a random ensemble per song
+    dur_mix = float("nan")
+    if dtype.startswith("float"):
+        start = time.perf_counter()
+        for cur_song in cbdb.songs:
+            MixerSimple(EnsembleRandom(cur_song).get_tracks(), dtype=dtype).get_mix()
+        dur_mix = time.perf_counter() - start
+
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((num_frames / dur_load, num_bytes / dur_load / 2**20, dur_mix, (rss_after - rss_before) / 1024))
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if "CHORALEDB_PATH" in os.environ:
+            root_dir = Path(os.environ["CHORALEDB_PATH"])
+        else:
+            root_dir = make_synthetic_db(Path(tmp_dir), num_songs=10, tracks_per_voice=3, duration=30.0)
+
+        print(f"{'dtype':>8} {'load [Mframes/s]':>17} {'load [MiB/s]':>13} {'mix all songs [s]':>18} "
+              f"{'peak RSS increase [MiB]':>24}")
+
+        for cur_dtype in ["float64", "float32", "int16"]:
+            queue = multiprocessing.Queue()
+            process = multiprocessing.Process(target=run, args=(root_dir, cur_dtype, queue))
+            process.start()
+            frames_per_sec, mib_per_sec, dur_mix, rss = queue.get()
+            process.join()
+
+            print(f"{cur_dtype:>8} {frames_per_sec / 1e6:>17.1f} {mib_per_sec:>13.1f} {dur_mix:>18.3f} {rss:>24.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+    Throughput of the Harte chord parser backends in labels parsed per second.
+
+    The labels cycle through all shorthands, added and removed degrees, and bass notes.
+"""
+import time
+
+from choralebricks.chord import PARSER_BACKENDS, SHORTHAND_STEPS, parse_harte
+
+NUM_LABELS = 20_000
+
+
+def make_labels(num_labels: int) -> list[str]:
+    roots = ["C", "G", "D", "A", "E", "Bb", "F#", "Eb"]
+    shorthands = list(SHORTHAND_STEPS)
+    suffixes = ["", "(9)", "(*5)", "/3", "(b7,*3)/5"]
+
+    labels = []
+    for i in range(num_labels):
+        labels.append(f"{roots[i % len(roots)]}:{shorthands[i % len(shorthands)]}{suffixes[i % len(suffixes)]}")
+    return labels
+
+
+def main():
+    labels = make_labels(NUM_LABELS)
+    print(f"{'backend':>8} {'time [s]':>10} {'labels/s':>12}")
+
+    for cur_backend in PARSER_BACKENDS:
+        parse_harte(labels[0], backend=cur_backend)  # warm-up
+
+        start = time.perf_counter()
+        for cur_label in labels:
+            parse_harte(cur_label, backend=cur_backend)
+        dur = time.perf_counter() - start
+
+        print(f"{cur_backend:>8} {dur:>10.3f} {len(labels) / dur:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
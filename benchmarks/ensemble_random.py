@@ -0,0 +1,55 @@
+"""
+    Random ensembles drawn per second.
+
+    Compares `EnsembleRandom` (index selection into the shared song) with the former
+    approach of deep-copying the whole song before selecting one track per voice.
+"""
+import copy
+import time
+from pathlib import Path
+
+import numpy as np
+
+from choralebricks.dataset import EnsembleRandom, Song, Track
+
+from .synthetic import INSTRUMENTS_BY_VOICE
+
+NUM_DRAWS = 20_000
+
+
+def make_song(tracks_per_voice: int = 6) -> Song:
+    song = Song(Path("Synthetic_Song"))
+    song.tracks = [
+        Track(song_id=song.id, path_audio=Path(f"{cur_voice}_{cur_instrument}.wav"), num_channels=1,
+              min_samples=441000, sample_rate=44100, voice=cur_voice, instrument=cur_instrument)
+        for cur_voice, cur_instruments in INSTRUMENTS_BY_VOICE.items()
+        for cur_instrument in cur_instruments[:tracks_per_voice]
+    ]
+    return song
+
+
+def draw_deepcopy(song: Song, rng: np.random.Generator) -> list[Track]:
+    song = copy.deepcopy(song)
+    return [song.tracks[rng.choice(song.get_track_ids_by_voice(cur_voice))] for cur_voice in song.voices]
+
+
+def main():
+    song = make_song()
+    rng = np.random.default_rng(0)
+
+    start = time.perf_counter()
+    for _ in range(NUM_DRAWS):
+        EnsembleRandom(song, rng=rng).get_tracks()
+    dur_index = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(NUM_DRAWS // 10):
+        draw_deepcopy(song, rng)
+    dur_deepcopy = 10 * (time.perf_counter() - start)
+
+    print(f"EnsembleRandom:        {NUM_DRAWS / dur_index:>12,.0f} ensembles/s")
+    print(f"deepcopy of the song:  {NUM_DRAWS / dur_deepcopy:>12,.0f} ensembles/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+    Cold import time of `choralebricks`, measured with `python -X importtime` in fresh processes.
+
+    Reports the median cumulative import time of the package and the slowest imported modules
+    (cumulative time, from the last run), and checks that heavy optional modules are not imported.
+"""
+import statistics
+import subprocess
+import sys
+
+NUM_RUNS = 5
+
+NUM_SLOWEST = 10
+
+# modules which are only needed for plotting or resampling and must not be imported with the package
+DEFERRED_MODULES = ["matplotlib.pyplot", "scipy.signal"]
+
+
+def import_times(module: str) -> dict[str, int]:
+    """Cumulative import time in microseconds per imported module."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, check=True)
+
+    times = dict()
+    for cur_line in result.stderr.splitlines():
+        if not cur_line.startswith("import time:") or "cumulative" in cur_line:
+            continue
+        _, cur_cumulative, cur_name = cur_line[len("import time:"):].split("|")
+        times[cur_name.strip()] = int(cur_cumulative)
+    return times
+
+
+def main():
+    runs = [import_times("choralebricks") for _ in range(NUM_RUNS)]
+    totals = [cur_run["choralebricks"] / 1e3 for cur_run in runs]
+
+    print(f"import choralebricks: {statistics.median(totals):.1f} ms (median of {NUM_RUNS} runs, "
+          f"min {min(totals):.1f} ms, max {max(totals):.1f} ms)")
+
+    print(f"\n{'module':>40} {'cumulative [ms]':>16}")
+    for cur_name, cur_time in sorted(runs[-1].items(), key=lambda x: -x[1])[:NUM_SLOWEST]:
+        print(f"{cur_name:>40} {cur_time / 1e3:>16.1f}")
+
+    print()
+    for cur_module in DEFERRED_MODULES:
+        print(f"{cur_module:>40} {'imported' if cur_module in runs[-1] else 'not imported':>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+    Construction time of a `SongDB` for a growing number of songs.
+
+    With the track metadata read once per `SongDB`, the time per track stays constant
+    when adding songs. Constructing each `Song` standalone re-reads `metadata_tracks.csv`
+    per song and therefore grows with songs x tracks.
+"""
+import tempfile
+import time
+from pathlib import Path
+
+from choralebricks.dataset import Song, SongDB
+
+from .synthetic import make_synthetic_db
+
+
+def time_songdb(root_dir: Path, repeats: int = 3) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        SongDB(root_dir, use_index=False)
+    return (time.perf_counter() - start) / repeats
+
+
+def time_standalone_songs(root_dir: Path, song_ids: list[str], repeats: int = 3) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for cur_song_id in song_ids:
+            Song(root_dir / cur_song_id)
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    print(f"{'#songs':>8} {'#tracks':>8} {'SongDB [s]':>12} {'per track [ms]':>15} {'standalone [s]':>15}")
+
+    for cur_num_songs in [10, 50, 100, 200]:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root_dir = make_synthetic_db(Path(tmp_dir), num_songs=cur_num_songs, duration=0.01)
+            cbdb = SongDB(root_dir, use_index=False)
+            num_tracks = sum(len(cur_song) for cur_song in cbdb.songs)
+
+            t_db = time_songdb(root_dir)
+            t_standalone = time_standalone_songs(root_dir, [cur_song.id for cur_song in cbdb.songs])
+
+            print(f"{cur_num_songs:>8} {num_tracks:>8} {t_db:>12.3f} {1000 * t_db / num_tracks:>15.3f} "
+                  f"{t_standalone:>15.3f}")
+
+
+if __name__ == "__main__":
+    main()
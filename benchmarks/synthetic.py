@@ -0,0 +1,99 @@
+"""
+    Synthetic datasets with the ChoraleBricks folder structure, used by the benchmarks and the tests.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import soundfile as sf
+
+INSTRUMENTS_BY_VOICE = {
+    1: ["tp", "fh", "fl", "ob", "cl", "as"],
+    2: ["tp", "fh", "ob", "cl", "as", "eh"],
+    3: ["bar", "fho", "tb", "cl", "ts", "eh"],
+    4: ["tba", "tb", "bar", "bcl", "bs", "fho"],
+}
+
+
+def write_synthetic_db(root_dir: Path,
+                       songs: dict[str, list[tuple[int, str]]],
+                       sample_rate: int = 44100,
+                       num_samples: int = 44100,
+                       samples_step: int = 0,
+                       seed: int = 0) -> Path:
+    """
+    Write a dataset with random audio.
+
+    Arguments
+    ---------
+    root_dir : Path
+        Root directory of the dataset, created if it does not exist.
+    songs : dict
+        Song ID ("Composer_Title") -> list of (voice, instrument) of the available tracks.
+    sample_rate : int
+        Sample rate of the audio files.
+    num_samples : int
+        Number of frames of the tracks of the first song.
+    samples_step : int
+        Additional frames per song index, to get songs of different lengths.
+    seed : int
+        Seed of the random audio.
+    """
+    rng = np.random.default_rng(seed)
+    root_dir.mkdir(parents=True, exist_ok=True)
+    meta_songs = []
+    meta_tracks = []
+
+    for cur_song_idx, (cur_song_id, cur_tracks) in enumerate(songs.items()):
+        meta_songs.append({
+            "song_id": cur_song_id,
+            "composer": cur_song_id.split("_")[0],
+            "title": cur_song_id.split("_")[1],
+            "year": 1700 + cur_song_idx,
+        })
+
+        path_song = root_dir / cur_song_id
+        (path_song / "tracks_normalized").mkdir(parents=True, exist_ok=True)
+        (path_song / "annotations").mkdir(exist_ok=True)
+
+        for cur_voice, cur_instrument in cur_tracks:
+            cur_name = f"{cur_song_id}_{cur_voice}_{cur_instrument}"
+            cur_audio = rng.uniform(-0.1, 0.1, size=num_samples + samples_step * cur_song_idx)
+            sf.write(path_song / "tracks_normalized" / f"{cur_name}.wav", cur_audio, sample_rate, subtype="PCM_16")
+            (path_song / "annotations" / f"{cur_name}_f0.csv").write_text("t,f0\n0.0,440.0\n")
+
+            meta_tracks.append({
+                "song_id": cur_song_id,
+                "voice": cur_voice,
+                "instrument": cur_instrument,
+                "path_audio": f"{cur_name}.wav",
+                "path_f0": f"{cur_name}_f0.csv",
+                "path_notes": f"{cur_name}_notes.csv",
+                "date": "2024-01-01",
+                "performer": f"P{cur_voice}{cur_instrument}",
+                "microphone": "mic",
+                "room": "room_a" if cur_voice % 2 else "room_b",
+            })
+
+    pd.DataFrame(meta_songs).to_csv(root_dir / "metadata_songs.csv", sep=";", index=False)
+    pd.DataFrame(meta_tracks).to_csv(root_dir / "metadata_tracks.csv", sep=";", index=False)
+
+    return root_dir
+
+
+def make_synthetic_db(root_dir: Path,
+                      num_songs: int = 10,
+                      tracks_per_voice: int = 3,
+                      duration: float = 1.0,
+                      sample_rate: int = 44100,
+                      seed: int = 0) -> Path:
+    """Write a dataset with `num_songs` songs and `tracks_per_voice` tracks for each of the four voices."""
+    songs = {
+        f"Synthetic_Song{cur_song_idx:03d}": [(cur_voice, cur_instrument)
+                                              for cur_voice, cur_instruments in INSTRUMENTS_BY_VOICE.items()
+                                              for cur_instrument in cur_instruments[:tracks_per_voice]]
+        for cur_song_idx in range(num_songs)
+    }
+
+    return write_synthetic_db(root_dir, songs, sample_rate=sample_rate, num_samples=int(duration * sample_rate),
+                              seed=seed)
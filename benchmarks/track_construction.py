@@ -0,0 +1,61 @@
+"""
+    Construction time and memory of the slotted `Track` record versus the pydantic `TrackModel`.
+
+    Each variant runs in a fresh process, memory is reported as increase of the peak RSS.
+"""
+import multiprocessing
+import resource
+import time
+from pathlib import Path
+
+from choralebricks.constants import Instrument
+from choralebricks.dataset import Track, TrackModel
+
+NUM_TRACKS = 200_000
+
+
+def make_kwargs(i: int) -> dict:
+    instruments = list(Instrument)
+    return dict(
+        song_id=f"Song{i // 100:04d}",
+        path_audio=Path(f"/data/Song{i // 100:04d}/tracks_normalized/{i}.wav"),
+        path_f0=Path(f"/data/Song{i // 100:04d}/annotations/{i}_f0.csv"),
+        num_channels=1,
+        min_samples=441000,
+        sample_rate=44100,
+        voice=i % 4 + 1,
+        instrument=instruments[i % len(instruments)],
+        date="2024-01-01",
+        performer="P01",
+        microphone="mic",
+        room="room",
+    )
+
+
+def run(cls, queue):
+    all_kwargs = [make_kwargs(i) for i in range(NUM_TRACKS)]
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    tracks = [cls(**cur_kwargs) for cur_kwargs in all_kwargs]
+    dur = time.perf_counter() - start
+
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((dur, (rss_after - rss_before) / 1024, len(tracks)))
+
+
+def main():
+    print(f"{'class':>12} {'time [s]':>10} {'per track [us]':>15} {'peak RSS increase [MiB]':>24}")
+
+    for cur_cls in [Track, TrackModel]:
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=run, args=(cur_cls, queue))
+        process.start()
+        dur, rss, num_tracks = queue.get()
+        process.join()
+
+        print(f"{cur_cls.__name__:>12} {dur:>10.3f} {1e6 * dur / num_tracks:>15.2f} {rss:>24.1f}")
+
+
+if __name__ == "__main__":
+    main()
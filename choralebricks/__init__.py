@@ -2,9 +2,13 @@
 """
 
 # import modules as sub-namespaces (e.g. `tdsp.generators.SinusoidalOsc`)
+from . import cache
 from . import constants
 from . import dataset
 from . import generators
+from . import index
+from . import shared
+from . import store
 from . import utils
 
 # import specific function/class into global namespace
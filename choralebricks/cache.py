@@ -0,0 +1,134 @@
+"""Process-level cache of decoded audio.
+
+Decoding the same track files again and again (e.g. for consecutive ensembles sharing tracks)
+dominates the cost of mixing. The cache keeps decoded tracks in memory up to a byte budget
+and evicts the least recently used ones. Entries are keyed by path, modification time, size,
+sample data type, and target sample rate, so changed files are decoded again and resampled
+versions are kept next to the original ones.
+
+The cache is disabled by default (budget of 0 bytes). Set a budget with
+`choralebricks.cache.AUDIO_CACHE.max_bytes = 2**30` or the environment variable
+`CHORALEBRICKS_AUDIO_CACHE_BYTES`.
+"""
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+import soundfile as sf
+
+from .utils import resample
+
+
+class AudioCache:
+    """
+    LRU cache of decoded audio with a byte budget.
+
+    The cached arrays are read-only and shared between all callers.
+
+    Attributes:
+        max_bytes (int): Budget for the decoded samples in bytes, 0 disables the cache.
+        hits (int): Number of requests served from the cache.
+        misses (int): Number of requests which required decoding.
+        evictions (int): Number of entries removed to stay within the budget.
+    """
+
+    def __init__(self, max_bytes: int = 0):
+        self._max_bytes = int(max_bytes)
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.num_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, max_bytes: int):
+        with self._lock:
+            self._max_bytes = int(max_bytes)
+            self._evict()
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_bytes > 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return (f"<AudioCache {self.num_bytes / 2**20:.1f}/{self._max_bytes / 2**20:.1f} MiB, "
+                f"#Entries: {len(self)}, Hits: {self.hits}, Misses: {self.misses}, Evictions: {self.evictions}>")
+
+    @property
+    def stats(self) -> dict:
+        """Counters and memory usage of the cache."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self),
+            "bytes": self.num_bytes,
+            "max_bytes": self._max_bytes,
+        }
+
+    def get(self, path: Union[str, Path], dtype: str = "float32", target_sr: Optional[int] = None) -> np.ndarray:
+        """
+        Decoded samples of an audio file, from the cache if available.
+
+        If `target_sr` is given, the samples are resampled to this rate (see `choralebricks.utils.resample`)
+        and the resampled version is cached.
+
+        Returns
+        -------
+        audio : np.ndarray
+            Read-only samples of shape (#frames,) for mono or (#frames, #channels) for multi-channel files.
+        """
+        st = os.stat(path)
+        key = (str(path), st.st_mtime_ns, st.st_size, np.dtype(dtype).str, target_sr)
+
+        with self._lock:
+            audio = self._entries.get(key)
+            if audio is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return audio
+            self.misses += 1
+
+        # decode outside of the lock, concurrent misses for the same file may decode twice
+        audio, samplerate = sf.read(path, dtype=dtype)
+        if target_sr is not None:
+            audio = resample(audio, samplerate, target_sr)
+        audio.flags.writeable = False
+
+        with self._lock:
+            if key not in self._entries and audio.nbytes <= self._max_bytes:
+                self._entries[key] = audio
+                self.num_bytes += audio.nbytes
+                self._evict()
+
+        return audio
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.num_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def _evict(self):
+        # remove least recently used entries until the budget is met (lock must be held)
+        while self.num_bytes > self._max_bytes and self._entries:
+            _, audio = self._entries.popitem(last=False)
+            self.num_bytes -= audio.nbytes
+            self.evictions += 1
+
+
+AUDIO_CACHE = AudioCache(max_bytes=int(os.environ.get("CHORALEBRICKS_AUDIO_CACHE_BYTES", 0)))
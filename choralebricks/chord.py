@@ -11,38 +11,137 @@ In ISMIR, vol. 5, pp. 66-71. 2005.
 """
 import math
 import os
+from functools import lru_cache
 
 import numpy as np
 import pandas as pd
 
 from lark import Lark, Transformer
 
+INTERVAL_STEPS = {
+    '1': 0, '2': 2, '3': 4, '4': 5, '5': 7, '6': 9, '7': 11,
+    '8': 12, '9': 2, '10': 4, '11': 5, '12': 7, '13': 9,
+}
+"""Steps (semitones above the root) of the intervals in Harte notation"""
+
+SHORTHAND_STEPS = {
+    "maj":     (0, 4, 7),
+    "min":     (0, 3, 7),
+    "dim":     (0, 3, 6),
+    "aug":     (0, 4, 8),
+    "maj7":    (0, 4, 7, 11),
+    "min7":    (0, 3, 7, 10),
+    "dim7":    (0, 3, 6, 9),
+    "hdim7":   (0, 3, 6, 10),
+    "minmaj7": (0, 3, 7, 11),
+    "maj6":    (0, 4, 7, 9),
+    "min6":    (0, 3, 7, 9),
+    "maj9":    (0, 4, 7, 11, 2),
+    "min9":    (0, 3, 7, 10, 2),
+    "sus4":    (0, 5, 7),
+    "sus2":    (0, 2, 7),
+    "7":       (0, 4, 7, 10),
+    "9":       (0, 4, 7, 10, 2),
+    "11":      (0, 4, 7, 10, 2, 5),
+    "13":      (0, 4, 7, 10, 2, 5, 9),
+}
+"""Steps of the chord shorthands in Harte notation"""
+
+PARSER_BACKENDS = ("fast", "lark")
+"""Available parsers for Harte notation, "lark" is the grammar-based reference implementation"""
+
+DEFAULT_PARSER_BACKEND = "fast"
+
+
+def degree_to_step(deg: str):
+    """Convert a degree string (e.g. "b3" or "*5") to a step float (-11.0 to 11.0)
+
+    A negative number indicates that the step should be removed from the final list.
+    The step is float to allow for -0.0 (removing the root note)
+    """
+    negate = deg.startswith('*')
+    interval = deg.lstrip('*#b')
+    step = float((INTERVAL_STEPS[interval] + deg.count('#') - deg.count('b')) % 12)
+
+    if negate:
+        step *= -1 # also making use of negative 0 here!
+
+    return step
+
+
+def parse_harte(harte_str, backend=None):
+    """Parse a chord in Harte notation into a dict with root, root_str, relative_steps, and bass
+
+    Arguments
+    ---------
+    harte_str : str
+        String in Harte format to be parsed
+    backend : str, optional
+        One of `PARSER_BACKENDS`, defaults to `DEFAULT_PARSER_BACKEND`
+    """
+    backend = DEFAULT_PARSER_BACKEND if backend is None else backend
+
+    if backend == "fast":
+        return _HarteParser(harte_str).parse()
+    elif backend == "lark":
+        return get_lark_parser().parse(harte_str)
+
+    raise ValueError(f"Unknown parser backend '{backend}', choose from {PARSER_BACKENDS}.")
+
+
+CHORD_CACHE_SIZE = 1024
+"""Maximum number of distinct labels kept by `Chord.from_harte`"""
+
+
 class Chord():
     """Representation of a chord provided in Harte notation
+
+    Chord objects are immutable, so they can be shared, see `Chord.from_harte`.
     """
 
-    def __init__(self, harte_str):
+    def __init__(self, harte_str, backend=None):
         """Representation of a chord provided in Harte notation
 
         Arguments
         ---------
         harte_str : str
             String in Harte format to be parsed
+        backend : str, optional
+            Parser backend, see `parse_harte`
         """
-        # defaults (just to be verbose, will be overwritten by the parsed properties)
-        self.root = None
-        self.root_str = "N.C."
-        self.relative_steps = []
-        self.bass = 0
-        self.harte = harte_str
+        cd = parse_harte(harte_str, backend=backend)
 
-        cd = HarteChord.parse(self.harte)
+        # defaults (just to be verbose, will be overwritten by the parsed properties)
+        props = {"root": None, "root_str": "N.C.", "relative_steps": [], "bass": 0}
 
         # add parsed properties to the chord object
         for key, val in cd.items():
-            assert key in ["root", "root_str", "relative_steps", "bass"], \
-                "Unknown property parsed from Harte notation."
-            setattr(self, key, val)
+            assert key in props, "Unknown property parsed from Harte notation."
+            props[key] = val
+
+        object.__setattr__(self, "harte", harte_str)
+        object.__setattr__(self, "root", props["root"])
+        object.__setattr__(self, "root_str", props["root_str"])
+        object.__setattr__(self, "relative_steps", tuple(props["relative_steps"]))
+        object.__setattr__(self, "bass", props["bass"])
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Chord objects are immutable.")
+
+    def __delattr__(self, name):
+        raise AttributeError("Chord objects are immutable.")
+
+    def __repr__(self):
+        return f"Chord({self.harte!r})"
+
+    @staticmethod
+    def from_harte(harte_str):
+        """Shared Chord object for a label in Harte notation
+
+        Labels are parsed once and kept in a bounded, thread-safe LRU cache
+        (see `chord_cache_info`), so repeated labels return the same object.
+        """
+        return _chord_from_harte(harte_str)
 
     def get_interval(self, midi):
         """Get the interval (0-11) of a given MIDI pitch relative to the root
@@ -65,6 +164,23 @@ class Chord():
         return self.root is None
 
 
+@lru_cache(maxsize=CHORD_CACHE_SIZE)
+def _chord_from_harte(harte_str):
+    return Chord(harte_str)
+
+
+def chord_cache_info():
+    """Hits, misses, and size of the label cache of `Chord.from_harte`
+    """
+    return _chord_from_harte.cache_info()
+
+
+def chord_cache_clear():
+    """Empty the label cache of `Chord.from_harte`
+    """
+    _chord_from_harte.cache_clear()
+
+
 class ChordSequence():
 
     @staticmethod
@@ -89,13 +205,18 @@ class ChordSequence():
 
         start_meas = df["start_meas"].to_numpy()
         end_meas = df["end_meas"].to_numpy()
-        chords = [Chord(s) for s in df["chord"]]
+        chords = [Chord.from_harte(s) for s in df["chord"]]
 
         return ChordSequence(start_meas, end_meas, chords)
 
     def __init__(self, starts, ends, chords):
         """Initialize a ChordSequence
+
+        The chords may be given in any order, but must not overlap.
         """
+        starts = np.asarray(starts)
+        ends = np.asarray(ends)
+
         assert len(starts.shape) == 1 \
            and np.array_equal(starts.shape, ends.shape) \
            and len(chords) == len(starts), \
@@ -104,20 +225,87 @@ class ChordSequence():
         self.bounds = np.hstack([starts[:,None], ends[:,None]])
         self.chords = chords
 
+        # bounds sorted by start (and end, to place empty chords first) for binary search
+        self._order = np.lexsort((ends, starts))
+        self._starts_sorted = starts[self._order]
+        self._ends_sorted = ends[self._order]
+
+        assert np.all(self._ends_sorted[:-1] <= self._starts_sorted[1:]), \
+           "ChordSequence has overlapping chord annotations."
+
+        # per chord: root, bass (relative to the root), and pitch class membership relative to the root,
+        # with an additional last row for N.C., so that chord index -1 maps to it
+        self.roots = np.array([0 if c.is_nc() else c.root for c in chords] + [0], dtype=int)
+        self.basses = np.array([c.bass for c in chords] + [0], dtype=int)
+        self.no_chord = np.array([c.is_nc() for c in chords] + [True], dtype=bool)
+        self.chord_masks = np.zeros((len(chords) + 1, 12), dtype=bool)
+        for i, c in enumerate(chords):
+            self.chord_masks[i, np.asarray(c.relative_steps, dtype=int) % 12] = True
+
+    def chord_indices_at(self, positions):
+        """Get the indices (into `chords`) of the chords at the given measure positions.
+
+        Uses a binary search over the chord bounds, i.e., O(n log m) for n positions and m chords.
+
+        Arguments
+        ---------
+        positions : float or array_like
+            measure position(s)
+
+        Returns
+        -------
+        idx : int or np.ndarray
+            chord index per position, -1 if no chord is annotated (N.C.)
+        """
+        positions = np.asarray(positions)
+
+        if len(self.chords) == 0:
+            idx = np.full(positions.shape, -1)
+        else:
+            # last chord starting at or before each position
+            sorted_idx = np.searchsorted(self._starts_sorted, positions, side="right") - 1
+            sorted_idx_clipped = np.maximum(sorted_idx, 0)
+            found = (sorted_idx >= 0) & (positions < self._ends_sorted[sorted_idx_clipped])
+            idx = np.where(found, self._order[sorted_idx_clipped], -1)
+
+        return int(idx) if idx.ndim == 0 else idx
+
+    def interval_to_root(self, positions, midi):
+        """Get the intervals (0-11) of MIDI pitches relative to the root of the chord at the given positions
+
+        Positions and pitches are broadcast against each other, e.g., one position per note.
+        Returns -1 where no chord is annotated (N.C.).
+        """
+        idx = self.chord_indices_at(positions)
+        intervals = (np.round(midi).astype(int) - self.roots[idx]) % 12
+
+        return np.where(self.no_chord[idx], -1, intervals)
+
+    def is_chord_note(self, positions, midi):
+        """Return whether or not MIDI pitches are member notes of the chord at the given positions
+
+        Positions and pitches are broadcast against each other, e.g., one position per note.
+        Always False where no chord is annotated (N.C.).
+        """
+        idx = self.chord_indices_at(positions)
+        intervals = (np.round(midi).astype(int) - self.roots[idx]) % 12
+
+        return self.chord_masks[idx, intervals]
+
     def get_chord_at(self, measure_pos):
         """Get the current chord for a given measure position.
 
         Returns N.C. if no chord is annotated for this measure position.
+        For an array of measure positions, a list with one chord per position is returned.
         """
-        idx = np.where((measure_pos >= self.bounds[:,0]) & (measure_pos < self.bounds[:,1]))
+        idx = self.chord_indices_at(measure_pos)
 
-        if len(idx[0]) == 0:
-            # return N.C., since no annotation was found
-            return Chord("X")
+        if np.ndim(idx) == 0:
+            # return N.C., if no annotation was found
+            return self.chords[idx] if idx >= 0 else Chord.from_harte("X")
 
-        assert len(idx[0]) == 1, "ChordSequence has overlapping chord annotations."
-
-        return self.chords[idx[0][0]]
+        nc = Chord.from_harte("X")
+        return [self.chords[i] if i >= 0 else nc for i in idx]
 
 
 
@@ -136,57 +324,13 @@ class ChordTransformer(Transformer):
         A negative number indicates that the step should be removed from the final list.
         The step is float to allow for -0.0 (removing the root note)
         """
-        str2step = {
-            '1': 0, '2': 2, '3': 4, '4': 5, '5': 7, '6': 9, '7': 11,
-            '8': 12, '9': 2, '10': 4, '11': 5, '12': 7, '13': 9,
-        }
-
-        negate = False
-        step = 0.
-        for i in range(len(deg)):
-            if deg[i].isnumeric():
-                step += int(str2step[deg[i]])
-            elif (deg[i] == '#'):
-                step += 1
-            elif (deg[i] == 'b'):
-                step -= 1
-            elif (deg[i] == '*'):
-                negate = True
-
-        step = step % 12
-
-        if negate:
-            step *= -1 # also making use of negative 0 here!
-
-        return step
-
+        return degree_to_step(deg)
 
     @staticmethod
     def shorthand(shorthand):
         """Convert a shorthand into a step list
         """
-        shorthand2steps = {
-            "maj":     [0, 4, 7],
-            "min":     [0, 3, 7],
-            "dim":     [0, 3, 6],
-            "aug":     [0, 4, 8],
-            "maj7":    [0, 4, 7, 11],
-            "min7":    [0, 3, 7, 10],
-            "dim7":    [0, 3, 6, 9],
-            "hdim7":   [0, 3, 6, 10],
-            "minmaj7": [0, 3, 7, 11],
-            "maj6":    [0, 4, 7, 9],
-            "min6":    [0, 3, 7, 9],
-            "maj9":    [0, 4, 7, 11, 2],
-            "min9":    [0, 3, 7, 10, 2],
-            "sus4":    [0, 5, 7],
-            "sus2":    [0, 2, 7],
-            "7":       [0, 4, 7, 10],
-            "9":       [0, 4, 7, 10, 2],
-            "11":      [0, 4, 7, 10, 2, 5],
-            "13":      [0, 4, 7, 10, 2, 5, 9],
-        }
-        return {"steps": shorthand2steps[shorthand[0]]}
+        return {"steps": list(SHORTHAND_STEPS[shorthand[0]])}
 
     @staticmethod
     def degree(degree):
@@ -224,7 +368,7 @@ class ChordTransformer(Transformer):
         """Split positive and negative floats into two integer lists
         """
         extra = [int(x) for x in degrees if math.copysign(1, x) == 1]
-        remove = [int(x) for x in degrees if math.copysign(1, x) == -1]
+        remove = [int(-x) for x in degrees if math.copysign(1, x) == -1]
 
         return {"extra": extra, "remove": remove}
 
@@ -251,10 +395,133 @@ class ChordTransformer(Transformer):
         return cd
 
 
+class _HarteParser():
+    """Hand-written single-pass parser for Harte notation
+
+    Accepts the same language as the grammar in `harte.lark` (including spaces between tokens)
+    and produces the same result as the Lark parser (`get_lark_parser`). Only used internally, see `parse_harte`.
+    """
+    _NATURALS = {'C': 0, 'D': 2, 'E': 4, 'F': 5, 'G': 7, 'A': 9, 'B': 11}
+    # longest match first, as the Lark lexer
+    _SHORTHANDS = sorted(SHORTHAND_STEPS, key=len, reverse=True)
+    _INTERVALS = sorted(INTERVAL_STEPS, key=len, reverse=True)
+
+    def __init__(self, harte_str):
+        self.s = harte_str
+        self.pos = 0
+
+    def error(self, expected):
+        raise ValueError(f"Invalid chord '{self.s}': expected {expected} at position {self.pos}.")
+
+    def peek(self):
+        # next non-space character, '' at the end
+        while self.pos < len(self.s) and self.s[self.pos] == ' ':
+            self.pos += 1
+        return self.s[self.pos] if self.pos < len(self.s) else ''
+
+    def accept(self, char):
+        if self.peek() == char:
+            self.pos += 1
+            return True
+        return False
+
+    def expect(self, char):
+        if not self.accept(char):
+            self.error(f"'{char}'")
+
+    def parse(self):
+        cd = {"root": None, "root_str": "N.C.", "relative_steps": [], "bass": 0}
+
+        first = self.peek()
+        if first in ('N', 'X'):
+            self.pos += 1
+        else:
+            self.note(cd)
+
+            if self.accept(':'):
+                if self.accept('('):
+                    self.degree_list(cd)
+                else:
+                    self.shorthand(cd)
+                    if self.accept('('):
+                        self.degree_list(cd)
+
+            if self.accept('/'):
+                cd["bass"] = int(self.degree())
+
+        if self.peek() != '':
+            self.error("end of chord")
+
+        return cd
+
+    def note(self, cd):
+        natural = self.peek()
+        if natural not in self._NATURALS:
+            self.error("a note name (A-G) or N.C. (N, X)")
+        self.pos += 1
+
+        root = self._NATURALS[natural]
+        root_str = natural
+        while self.peek() in ('#', 'b'):
+            modifier = self.s[self.pos]
+            self.pos += 1
+            root += 1 if modifier == '#' else -1
+            root_str += modifier
+
+        cd["root"] = root
+        cd["root_str"] = root_str
+
+    def shorthand(self, cd):
+        self.peek()
+        for cur_shorthand in self._SHORTHANDS:
+            if self.s.startswith(cur_shorthand, self.pos):
+                self.pos += len(cur_shorthand)
+                cd["relative_steps"] += SHORTHAND_STEPS[cur_shorthand]
+                return
+        self.error("a shorthand or '('")
+
+    def degree(self):
+        deg = ''
+        if self.accept('*'):
+            deg += '*'
+        while self.peek() in ('#', 'b'):
+            deg += self.s[self.pos]
+            self.pos += 1
+
+        self.peek()
+        for cur_interval in self._INTERVALS:
+            if self.s.startswith(cur_interval, self.pos):
+                self.pos += len(cur_interval)
+                return degree_to_step(deg + cur_interval)
+        self.error("an interval (1-13)")
+
+    def degree_list(self, cd):
+        degrees = [self.degree()]
+        while self.accept(','):
+            degrees.append(self.degree())
+        self.expect(')')
+
+        remove = [int(-x) for x in degrees if math.copysign(1, x) == -1]
+        cd["relative_steps"] += [int(x) for x in degrees if math.copysign(1, x) == 1]
+        cd["relative_steps"] = [x for x in cd["relative_steps"] if x not in remove]
+
+
 _GRAMMAR_FILE = os.path.join(os.path.dirname(__file__), 'harte.lark')
 
-with open(_GRAMMAR_FILE, 'r', encoding='utf-8') as g:
-    _HARTE_LARK_GRAMMAR = g.read()
 
-HarteChord = Lark(_HARTE_LARK_GRAMMAR, parser="lalr", start="chord",
-                  propagate_positions=False, maybe_placeholders=False, transformer=ChordTransformer())
+@lru_cache(maxsize=None)
+def get_lark_parser():
+    """LALR parser for the Harte grammar (`harte.lark`), built on first use
+    """
+    with open(_GRAMMAR_FILE, 'r', encoding='utf-8') as g:
+        grammar = g.read()
+
+    return Lark(grammar, parser="lalr", start="chord",
+                propagate_positions=False, maybe_placeholders=False, transformer=ChordTransformer())
+
+
+def __getattr__(name):
+    # `HarteChord` used to be built at import time, keep it available as a module attribute
+    if name == "HarteChord":
+        return get_lark_parser()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
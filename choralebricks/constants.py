@@ -1,5 +1,4 @@
 from enum import Enum
-import matplotlib.pyplot as plt
 
 
 NUM_VOICES = 4
@@ -84,11 +83,12 @@ INSTRUMENTS_WOODWIND = [
 ]
 
 VOICE_COLORS = {
-    # Mapping from Voices to plot colors.
-    Voices.SOPRANO: plt.cm.tab10(3),
-    Voices.ALTO: plt.cm.tab10(2),
-    Voices.TENOR: plt.cm.tab10(1),
-    Voices.BASS: plt.cm.tab10(0)
+    # Mapping from Voices to plot colors (RGBA of matplotlib's tab10 colormap,
+    # hardcoded to avoid importing matplotlib).
+    Voices.SOPRANO: (214 / 255, 39 / 255, 40 / 255, 1.0),  # tab10(3)
+    Voices.ALTO: (44 / 255, 160 / 255, 44 / 255, 1.0),  # tab10(2)
+    Voices.TENOR: (255 / 255, 127 / 255, 14 / 255, 1.0),  # tab10(1)
+    Voices.BASS: (31 / 255, 119 / 255, 180 / 255, 1.0)  # tab10(0)
 }
 
 VOICE_STRINGS = {
@@ -1,25 +1,156 @@
-import copy
+import bisect
+import contextlib
+import itertools
 import logging
+import math
 import os
 from abc import ABC, abstractmethod
-from itertools import product
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass, fields
+from enum import Enum
 from pathlib import Path
-from typing import Any, Iterator, Optional, Union
+from typing import Any, Callable, Iterator, Optional, Union
 
 import numpy as np
 import pandas as pd
 import soundfile as sf
 from pydantic import BaseModel, model_validator
 
+from .cache import AUDIO_CACHE
 from .constants import (INSTRUMENTS_BRASS, INSTRUMENTS_WOODWIND, Instrument,
                         InstrumentType)
+from .index import default_index_path, read_index, write_index
+from .store import current_store, get_store
+from .utils import measures_to_seconds, resample, resample_window, resampled_length
 
 logger = logging.getLogger(__name__)
 
 
-class Track(BaseModel):
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Track:
     """
     Represents a track and its metadata.
+
+    Compact, immutable record used throughout the package.
+    For validation and serialization with pydantic, see `TrackModel` (`Track.to_model`).
+    """
+
+    song_id: str = None
+    path_audio: Union[str, Path] = None
+    path_f0: Optional[Union[str, Path]] = None
+    path_notes: Optional[Union[str, Path]] = None
+    path_sheet_music_csv: Optional[Union[str, Path]] = None
+    path_sheet_music_midi: Optional[Union[str, Path]] = None
+    path_sheet_music_mxml: Optional[Union[str, Path]] = None
+    path_chords: Optional[Union[str, Path]] = None
+    num_channels: int = 0
+    min_samples: int = 0
+    sample_rate: int = 0
+    voice: int = 0
+    instrument: Instrument
+    instrument_type: InstrumentType = None
+    date: Optional[str] = None
+    performer: Optional[str] = None
+    microphone: Optional[str] = None
+    room: Optional[str] = None
+
+    def __post_init__(self):
+        # set instrument_type based on instrument
+        if not isinstance(self.instrument, Instrument):
+            object.__setattr__(self, "instrument", Instrument(self.instrument))
+        object.__setattr__(self, "instrument_type", _instrument_type(self.instrument, self.instrument_type))
+
+    def __repr__(self):
+        return f"(V: {self.voice}, I: {self.instrument})"
+
+    def audio(self,
+              start: int = 0,
+              frames: int = -1,
+              dtype: str = "float32",
+              mmap: bool = False,
+              target_sr: Optional[int] = None) -> np.ndarray:
+        """
+        Load the audio of the track.
+
+        Arguments
+        ---------
+        start : int
+            First frame to read (the file is seeked, preceding frames are not decoded).
+        frames : int
+            Number of frames to read, -1 reads until the end.
+        dtype : str
+            Data type of the returned samples: "float32", "float64", or "int16"/"int32"
+            (integer types pass the PCM samples through without conversion to float).
+        mmap : bool
+            Return a view into the opened audio store (see `choralebricks.store.open_store`)
+            instead of decoding the file. `dtype` must match the data type of the store.
+        target_sr : int, optional
+            Resample to this sample rate with a polyphase filter (see `choralebricks.utils.resample`),
+            requires a floating point `dtype`. `start` and `frames` refer to the target rate.
+            Excerpts are resampled with the surrounding source frames the filter requires, so they equal
+            the same part of the resampled track. If the audio cache is enabled, it keeps the resampled track.
+
+        Returns
+        -------
+        audio : np.ndarray
+            Samples of shape (#frames,) for mono or (#frames, #channels) for multi-channel tracks.
+            If the audio cache is enabled (see `choralebricks.cache`), this is a read-only view
+            into the cached track.
+        """
+        if target_sr is not None and target_sr != self.sample_rate:
+            if AUDIO_CACHE.enabled and not mmap:
+                audio = AUDIO_CACHE.get(self.path_audio, dtype=dtype, target_sr=target_sr)
+                return audio[start:(start + frames) if frames >= 0 else None]
+
+            # read the corresponding excerpt at the original sample rate, aligned to the polyphase grid
+            src_start, src_frames, offset = resample_window(start, frames, self.sample_rate, target_sr)
+            audio = resample(self.audio(src_start, src_frames, dtype=dtype, mmap=mmap), self.sample_rate, target_sr)
+            return audio[offset:(offset + frames) if frames >= 0 else None]
+
+        if mmap:
+            store = get_store()
+            if store.dtype != np.dtype(dtype):
+                raise ValueError(f"The audio store holds {store.dtype} samples, requested {dtype}.")
+            return store.get(self, start=start, frames=frames)
+
+        if AUDIO_CACHE.enabled:
+            audio = AUDIO_CACHE.get(self.path_audio, dtype=dtype)
+            return audio[start:(start + frames) if frames >= 0 else None]
+
+        audio, _ = sf.read(self.path_audio, start=start, frames=frames, dtype=dtype)
+        return audio
+
+    def to_model(self) -> "TrackModel":
+        """Validated pydantic representation of the track."""
+        return TrackModel(**{cur_field.name: getattr(self, cur_field.name) for cur_field in fields(self)})
+
+    def to_record(self) -> dict:
+        """JSON-serializable representation of the track (used by the dataset index)."""
+        record = dict()
+        for cur_field in fields(self):
+            cur_value = getattr(self, cur_field.name)
+            if isinstance(cur_value, Enum):
+                cur_value = cur_value.value
+            elif isinstance(cur_value, Path):
+                cur_value = str(cur_value)
+            record[cur_field.name] = cur_value
+        return record
+
+    @classmethod
+    def from_record(cls, record: dict) -> "Track":
+        """Inverse of `to_record`."""
+        record = dict(record)
+        for cur_field in TRACK_PATH_FIELDS:
+            if record.get(cur_field) is not None:
+                record[cur_field] = Path(record[cur_field])
+        return cls(**record)
+
+
+class TrackModel(BaseModel):
+    """
+    Pydantic model of a track, used for validation and serialization.
+
+    Convert from and to the lightweight `Track` via `Track.to_model` and `TrackModel.to_track`.
     """
 
     song_id: str = None
@@ -51,8 +182,35 @@ class Track(BaseModel):
             values["instrument_type"] = InstrumentType.WOODWIND
         return values
 
-    def __repr__(self):
-        return f"(V: {self.voice}, I: {self.instrument})"
+    def to_track(self) -> Track:
+        """Lightweight `Track` record with the validated values."""
+        return Track(**dict(self))
+
+
+_INSTRUMENT_TYPES = {
+    # Mapping from `Instrument` to `InstrumentType`.
+    **{cur_instrument: InstrumentType.BRASS for cur_instrument in INSTRUMENTS_BRASS},
+    **{cur_instrument: InstrumentType.WOODWIND for cur_instrument in INSTRUMENTS_WOODWIND},
+}
+
+
+def _instrument_type(instrument: Instrument, default: Optional[InstrumentType] = None) -> Optional[InstrumentType]:
+    instrument_type = _INSTRUMENT_TYPES.get(instrument)
+    if instrument_type is None and default is not None:
+        instrument_type = InstrumentType(default)
+    return instrument_type
+
+
+TRACK_PATH_FIELDS = [
+    # Fields of `Track` which hold file paths.
+    "path_audio",
+    "path_f0",
+    "path_notes",
+    "path_sheet_music_csv",
+    "path_sheet_music_midi",
+    "path_sheet_music_mxml",
+    "path_chords",
+]
 
 
 class Song:
@@ -67,6 +225,9 @@ class Song:
         Root directory of the song.
     tracks : list[Track]
         List of associated multi-tracks for the song.
+        For lazy songs, the tracks are collected on first access.
+        Lookup tables by voice and instrument are rebuilt whenever `tracks` is assigned
+        (modify the list only by assigning a new one).
     score : tbd
         Score representation of the song (to be defined).
     alignment : tbd
@@ -84,8 +245,15 @@ class Song:
         Returns the next track in the iteration.
     __getitem__(key: Union[int, str]) -> Track:
         Retrieves a track by its index or string identifier.
-    __collect_tracks(suffix="wav"):
+    get_tracks_by_voice(voice: int) -> list[Track]:
+        Returns all tracks of a voice.
+    get_track_ids_by_voice(voice: int) -> list[int]:
+        Returns the indices (into `tracks`) of all tracks of a voice.
+    get_tracks_by_instrument(instrument: Instrument) -> list[Track]:
+        Returns all tracks of an instrument.
+    __collect_tracks(executor=None):
         Collects and initializes track objects from the song's directory.
+        File probes are distributed over the `executor` if given.
     """
 
     def __init__(self,
@@ -93,6 +261,10 @@ class Song:
                  title: str = None,
                  composer: str = None,
                  year: int = None,
+                 tracks: Optional[list[Track]] = None,
+                 df_meta_tracks: Optional[pd.DataFrame] = None,
+                 executor: Optional[Executor] = None,
+                 lazy: bool = False,
                  **kwargs) -> None:
         super().__init__(**kwargs)
         self.song_dir: Path = song_dir
@@ -100,19 +272,74 @@ class Song:
         self.composer: str = composer
         self.year: int = year
         self.id: str = self.song_dir.name
-        self.tracks: list[Track] = []
+        self.df_meta_tracks: Optional[pd.DataFrame] = df_meta_tracks
+        self._tracks: Optional[list[Track]] = []
+        self._tracks_by_id: dict[str, Track] = dict()
+        self._tracks_by_key: dict[tuple[int, Instrument], Track] = dict()
+        self._tracks_by_voice: dict[int, list[Track]] = dict()
+        self._track_ids_by_voice: dict[int, list[int]] = dict()
+        self._tracks_by_instrument: dict[Instrument, list[Track]] = dict()
         self._current_index = 0
 
+        # tracks are already known (e.g. restored from the dataset index)
+        if tracks is not None:
+            self.tracks = tracks
         # check if the song_dir exists
         # (otherwise, it is a dummy song for testing purposes)
-        if self.song_dir.is_dir():
-            self.df_meta_tracks = pd.read_csv(self.song_dir.parent / "metadata_tracks.csv", sep=";")
-            self.df_meta_tracks = self.df_meta_tracks[self.df_meta_tracks["song_id"] == self.id]
-
-            self.__collect_tracks()
+        elif self.song_dir.is_dir():
+            if lazy:
+                # collected on first access
+                self._tracks = None
+            else:
+                self.tracks = self.__collect_tracks(executor=executor)
+
+    @property
+    def tracks(self) -> list[Track]:
+        self.__ensure_tracks()
+        return self._tracks
+
+    @tracks.setter
+    def tracks(self, tracks: list[Track]):
+        self._tracks = list(tracks)
+
+        # hash indexes for constant time lookups (the first track wins for duplicate keys)
+        self._tracks_by_id = dict()
+        self._tracks_by_key = dict()
+        self._tracks_by_voice = dict()
+        self._track_ids_by_voice = dict()
+        self._tracks_by_instrument = dict()
+
+        for cur_idx, cur_track in enumerate(self._tracks):
+            self._tracks_by_id.setdefault(f"{int(cur_track.voice):02d}_{cur_track.instrument.value}", cur_track)
+            self._tracks_by_key.setdefault((int(cur_track.voice), cur_track.instrument), cur_track)
+            self._tracks_by_voice.setdefault(int(cur_track.voice), []).append(cur_track)
+            self._track_ids_by_voice.setdefault(int(cur_track.voice), []).append(cur_idx)
+            self._tracks_by_instrument.setdefault(cur_track.instrument, []).append(cur_track)
+
+    @property
+    def voices(self) -> list[int]:
+        """Sorted list of the voices covered by the tracks."""
+        self.__ensure_tracks()
+        return sorted(self._track_ids_by_voice.keys())
+
+    def get_tracks_by_voice(self, voice: int) -> list[Track]:
+        """All tracks of the given voice (in the order of `tracks`)."""
+        self.__ensure_tracks()
+        return self._tracks_by_voice.get(int(voice), [])
+
+    def get_track_ids_by_voice(self, voice: int) -> list[int]:
+        """Indices (into `tracks`) of all tracks of the given voice."""
+        self.__ensure_tracks()
+        return self._track_ids_by_voice.get(int(voice), [])
+
+    def get_tracks_by_instrument(self, instrument: Union[Instrument, str]) -> list[Track]:
+        """All tracks of the given instrument (in the order of `tracks`)."""
+        self.__ensure_tracks()
+        return self._tracks_by_instrument.get(Instrument(instrument), [])
 
     def __repr__(self):
-        return f"<{self.id}, {self.composer}, #Tracks: {len(self.tracks)}>"
+        num_tracks = "?" if self._tracks is None else len(self._tracks)
+        return f"<{self.id}, {self.composer}, #Tracks: {num_tracks}>"
 
     def __len__(self):
         return len(self.tracks)
@@ -130,16 +357,23 @@ class Song:
 
     def __getitem__(self, key: Union[int, str]) -> Track:
         if isinstance(key, str):
+            self.__ensure_tracks()
+
+            # fast path for the canonical format, e.g. '01_tp'
+            track = self._tracks_by_id.get(key)
+            if track is not None:
+                return track
+
             try:
                 voice, inst = key.split("_")
                 voice = int(voice)
             except ValueError as exc:
                 raise KeyError(f"Track key '{key}' is not in the correct format e.g. '01_tp'.") from exc
 
-            for track in self.tracks:
-                if int(track.voice) == int(voice) and track.instrument.value == inst:
-                    return track
-            raise KeyError(f"Track with id '{key}' not found.")
+            try:
+                return self._tracks_by_key[(voice, Instrument(inst))]
+            except (KeyError, ValueError) as exc:
+                raise KeyError(f"Track with id '{key}' not found.") from exc
         elif isinstance(key, int):
             try:
                 return self.tracks[key]
@@ -148,62 +382,113 @@ class Song:
         else:
             raise TypeError("Key must be a string (track_id) or an integer (index).")
 
-    def __collect_tracks(self, suffix="wav"):
+    def __ensure_tracks(self):
+        # collect the tracks of lazy songs
+        if self._tracks is None:
+            self.tracks = self.__collect_tracks()
+
+    def to_record(self) -> dict:
+        """JSON-serializable representation of the song and its tracks (used by the dataset index)."""
+        return {
+            "song_id": self.id,
+            "title": _to_builtin(self.title),
+            "composer": _to_builtin(self.composer),
+            "year": _to_builtin(self.year),
+            "tracks": [cur_track.to_record() for cur_track in self.tracks],
+        }
+
+    def __collect_tracks(self, executor: Optional[Executor] = None) -> list[Track]:
+        # track metadata can be handed over by the SongDB, which reads the CSV only once
+        if self.df_meta_tracks is None:
+            df_meta_tracks = pd.read_csv(self.song_dir.parent / "metadata_tracks.csv", sep=";")
+            self.df_meta_tracks = df_meta_tracks[df_meta_tracks["song_id"] == self.id]
+
+        meta_tracks = [cur_meta_track for _, cur_meta_track in self.df_meta_tracks.iterrows()]
+
+        # probe the files of all tracks, executor.map keeps the order of the metadata
+        if executor is None:
+            return [self.__probe_track(cur_meta_track) for cur_meta_track in meta_tracks]
+        return list(executor.map(self.__probe_track, meta_tracks))
+
+    def __probe_track(self, meta_track: pd.Series) -> Track:
         tracks_dir = self.song_dir / "tracks_normalized"
 
-        # get all the audio files
-        for _, cur_meta_track in self.df_meta_tracks.iterrows():
-            logger.info(f"Adding track: {cur_meta_track.path_audio}...")
-            cur_path_tracks = tracks_dir / cur_meta_track.path_audio
+        logger.info(f"Adding track: {meta_track.path_audio}...")
+        cur_path_tracks = tracks_dir / meta_track.path_audio
 
-            try:
-                assert cur_path_tracks.is_file()
-            except AssertionError:
-                logger.error(f"File {cur_path_tracks} not found.")
-
-            file_info = sf.info(cur_path_tracks)
-
-            cur_path_f0 = self.song_dir / "annotations" / cur_meta_track["path_f0"]
-            cur_path_notes = self.song_dir / "annotations" / cur_meta_track["path_notes"]
-            cur_path_sheet_music_csv = self.song_dir / f"{self.id}.csv"
-            cur_path_sheet_music_midi = self.song_dir / f"{self.id}.mid"
-            cur_path_sheet_music_mxml = self.song_dir / f"{self.id}.musicxml"
-            cur_path_chords = self.song_dir / "annotations" / f"chords.csv"
-
-            if not cur_path_f0.is_file():
-                cur_path_f0 = None
-
-            if not cur_path_notes.is_file():
-                cur_path_notes = None
-
-            cur_track = Track(
-                song_id=self.id,
-                path_audio=cur_path_tracks,
-                path_f0=cur_path_f0,
-                path_notes=cur_path_notes,
-                path_sheet_music_csv=cur_path_sheet_music_csv,
-                path_sheet_music_midi=cur_path_sheet_music_midi,
-                path_sheet_music_mxml=cur_path_sheet_music_mxml,
-                path_chords=cur_path_chords,
-                num_channels=file_info.channels,
-                min_samples=file_info.frames,
-                sample_rate=file_info.samplerate,
-                voice=int(cur_meta_track["voice"]),
-                instrument=Instrument(cur_meta_track["instrument"]),
-                date=cur_meta_track["date"],
-                performer=cur_meta_track["performer"],
-                microphone=cur_meta_track["microphone"],
-                room=cur_meta_track["room"],
-            )
-            self.tracks.append(cur_track)
+        try:
+            assert cur_path_tracks.is_file()
+        except AssertionError:
+            logger.error(f"File {cur_path_tracks} not found.")
+
+        file_info = sf.info(cur_path_tracks)
+
+        cur_path_f0 = self.song_dir / "annotations" / meta_track["path_f0"]
+        cur_path_notes = self.song_dir / "annotations" / meta_track["path_notes"]
+        cur_path_sheet_music_csv = self.song_dir / f"{self.id}.csv"
+        cur_path_sheet_music_midi = self.song_dir / f"{self.id}.mid"
+        cur_path_sheet_music_mxml = self.song_dir / f"{self.id}.musicxml"
+        cur_path_chords = self.song_dir / "annotations" / f"chords.csv"
+
+        if not cur_path_f0.is_file():
+            cur_path_f0 = None
+
+        if not cur_path_notes.is_file():
+            cur_path_notes = None
+
+        return Track(
+            song_id=self.id,
+            path_audio=cur_path_tracks,
+            path_f0=cur_path_f0,
+            path_notes=cur_path_notes,
+            path_sheet_music_csv=cur_path_sheet_music_csv,
+            path_sheet_music_midi=cur_path_sheet_music_midi,
+            path_sheet_music_mxml=cur_path_sheet_music_mxml,
+            path_chords=cur_path_chords,
+            num_channels=file_info.channels,
+            min_samples=file_info.frames,
+            sample_rate=file_info.samplerate,
+            voice=int(meta_track["voice"]),
+            instrument=Instrument(meta_track["instrument"]),
+            date=meta_track["date"],
+            performer=meta_track["performer"],
+            microphone=meta_track["microphone"],
+            room=meta_track["room"],
+        )
 
 
 class SongDB:
     """
     Represents the Song Database. Collects songs from a pre-defined folder structure.
+
+    Scanning the dataset parses the metadata CSVs and probes every audio file.
+    The result is stored in a persistent index file, which is reused as long as
+    none of the metadata CSVs and audio files changed (see `choralebricks.index`).
+
+    Parameters
+    ----------
+    root_dir : str, optional
+        Root directory of the dataset. Defaults to the environment variable `CHORALEDB_PATH`.
+    use_index : bool
+        Read the dataset from (and write it to) the persistent index file.
+    index_path : str or Path, optional
+        Location of the index file. Defaults to a file in the user cache directory.
+    workers : int
+        Number of threads used to probe the track files when scanning the dataset.
+        Useful on high-latency (network) file systems. The order of songs and tracks
+        does not depend on the number of workers.
+    lazy : bool
+        Only read the song metadata. Each song collects its tracks (and probes the audio files)
+        on first access, e.g. `len(song)`, iteration, or indexing. The index file is not used.
     """
 
-    def __init__(self, root_dir: str = None, **kwargs) -> None:
+    def __init__(self,
+                 root_dir: str = None,
+                 use_index: bool = True,
+                 index_path: Optional[Union[str, Path]] = None,
+                 workers: int = 1,
+                 lazy: bool = False,
+                 **kwargs) -> None:
         super().__init__(**kwargs)
 
         if root_dir is None:
@@ -215,10 +500,35 @@ class SongDB:
         else:
             self.root_dir = Path(root_dir).expanduser()
 
-        self.songs: list[Song] = []
+        self.use_index = use_index
+        self.workers = workers
+        self.lazy = lazy
+        if index_path is None:
+            self.index_path = default_index_path(self.root_dir)
+        else:
+            self.index_path = Path(index_path).expanduser()
+
+        self.songs = []
         self.__collect_songs()
         self._current_index = 0
 
+    @classmethod
+    def from_records(cls, root_dir: Union[str, Path], records: list[dict]) -> "SongDB":
+        """Dataset from song records (see `Song.to_record`) without accessing the dataset folder.
+
+        Used to restore a dataset which was scanned elsewhere, e.g. in a parent process
+        (see `choralebricks.shared`).
+        """
+        songdb = cls.__new__(cls)
+        songdb.root_dir = Path(root_dir)
+        songdb.use_index = False
+        songdb.workers = 1
+        songdb.lazy = False
+        songdb.index_path = None
+        songdb.songs = [songdb.__song_from_record(cur_record) for cur_record in records]
+        songdb._current_index = 0
+        return songdb
+
     def __len__(self):
         return len(self.songs)
 
@@ -233,12 +543,100 @@ class SongDB:
             return song
         raise StopIteration
 
+    @property
+    def songs(self) -> list[Song]:
+        return self._songs
+
+    @songs.setter
+    def songs(self, songs: list[Song]):
+        self._songs = list(songs)
+        self._songs_by_id = {cur_song.id: cur_song for cur_song in reversed(self._songs)}
+        self._catalog = None
+        self._catalog_tracks = None
+        self._catalog_masks = dict()
+
+    @property
+    def catalog(self) -> pd.DataFrame:
+        """Columnar table of all tracks in the dataset (one row per track).
+
+        The table is built once and cached, treat it as read-only (or use `to_frame`).
+        Row `i` describes the track `self.catalog_tracks[i]`.
+        Enum-valued attributes (instrument, instrument type) are stored as their string values.
+        """
+        if self._catalog is None:
+            self._catalog_tracks = [cur_track for cur_song in self.songs for cur_track in cur_song.tracks]
+            self._catalog = _tracks_to_frame(self._catalog_tracks)
+        return self._catalog
+
+    @property
+    def catalog_tracks(self) -> list[Track]:
+        """Track objects in the order of the rows of `catalog`."""
+        self.catalog  # builds the track list along with the catalog
+        return self._catalog_tracks
+
+    def to_frame(self) -> pd.DataFrame:
+        """Copy of the track catalog, see `catalog`."""
+        return self.catalog.copy()
+
+    def query_mask(self, **criteria) -> np.ndarray:
+        """Boolean mask over the catalog rows matching all criteria.
+
+        Each keyword is a catalog column, each value either a single value or a list/tuple/set of
+        accepted values. Enums (e.g. `Instrument.TRUMPET`, `InstrumentType.BRASS`, `Voices.ALTO`) are
+        matched by their value. Masks per (column, value) are computed once and cached.
+
+        Examples
+        --------
+        >>> cbdb.query_mask(voice=2, instrument_type=InstrumentType.WOODWIND, sample_rate=44100)
+        """
+        mask = np.ones(self.catalog.shape[0], dtype=bool)
+
+        for cur_column, cur_values in criteria.items():
+            if cur_column not in self.catalog.columns:
+                raise KeyError(f"Unknown catalog column '{cur_column}'.")
+
+            if isinstance(cur_values, (list, tuple, set, frozenset)):
+                cur_mask = np.zeros_like(mask)
+                for cur_value in cur_values:
+                    cur_mask |= self.__value_mask(cur_column, cur_value)
+            else:
+                cur_mask = self.__value_mask(cur_column, cur_values)
+
+            mask &= cur_mask
+
+        return mask
+
+    def query(self, **criteria) -> pd.DataFrame:
+        """Rows of the catalog matching all criteria, see `query_mask`."""
+        return self.catalog[self.query_mask(**criteria)]
+
+    def select(self, **criteria) -> list[Track]:
+        """Tracks matching all criteria, see `query_mask`.
+
+        Examples
+        --------
+        >>> cbdb.select(voice=2, instrument_type="woodwind", room="Studio")
+        """
+        tracks = self.catalog_tracks
+        return [tracks[i] for i in np.flatnonzero(self.query_mask(**criteria))]
+
+    def __value_mask(self, column: str, value: Any) -> np.ndarray:
+        if isinstance(value, Enum):
+            value = value.value
+
+        key = (column, value)
+        if key not in self._catalog_masks:
+            mask = (self.catalog[column] == value).to_numpy(dtype=bool)
+            mask.flags.writeable = False
+            self._catalog_masks[key] = mask
+        return self._catalog_masks[key]
+
     def __getitem__(self, key: Union[int, str]) -> Song:
         if isinstance(key, str):
-            for song in self.songs:
-                if song.id == key:
-                    return song
-            raise KeyError(f"Song with id '{key}' not found.")
+            try:
+                return self._songs_by_id[key]
+            except KeyError as exc:
+                raise KeyError(f"Song with id '{key}' not found.") from exc
         elif isinstance(key, int):
             try:
                 return self.songs[key]
@@ -248,16 +646,119 @@ class SongDB:
             raise TypeError("Key must be a string (song_id) or an integer (index).")
 
     def __collect_songs(self):
+        if self.lazy:
+            self.__scan_songs_lazy()
+            return
+
+        if self.use_index:
+            records = read_index(self.index_path, self.root_dir)
+            if records is not None:
+                logger.info(f"Loading songs from index {self.index_path}...")
+                self.songs = [self.__song_from_record(cur_record) for cur_record in records]
+                return
+
+        self.__scan_songs()
+
+        if self.use_index:
+            write_index(self.index_path, self.root_dir, [cur_song.to_record() for cur_song in self.songs])
+
+    def __song_from_record(self, record: dict) -> Song:
+        return Song(song_dir=self.root_dir / record["song_id"],
+                    composer=record["composer"],
+                    title=record["title"],
+                    year=record["year"],
+                    tracks=[Track.from_record(cur_track) for cur_track in record["tracks"]])
+
+    def __scan_songs_lazy(self):
         df_meta_songs = pd.read_csv(self.root_dir / "metadata_songs.csv", sep=";")
 
-        for _, cur_meta_song in df_meta_songs.iterrows():
-            logger.info(f"Adding song {cur_meta_song['song_id']}...")
-            cur_path_song = self.root_dir / cur_meta_song["song_id"]
-            cur_song = Song(song_dir=cur_path_song,
-                            composer=cur_meta_song["composer"],
-                            title=cur_meta_song["title"],
-                            year=cur_meta_song["year"])
-            self.songs.append(cur_song)
+        self.songs = [Song(song_dir=self.root_dir / cur_meta_song["song_id"],
+                           composer=cur_meta_song["composer"],
+                           title=cur_meta_song["title"],
+                           year=cur_meta_song["year"],
+                           lazy=True)
+                      for _, cur_meta_song in df_meta_songs.iterrows()]
+
+    def __scan_songs(self):
+        df_meta_songs = pd.read_csv(self.root_dir / "metadata_songs.csv", sep=";")
+
+        # read the track metadata once and hand each song its slice
+        df_meta_tracks = pd.read_csv(self.root_dir / "metadata_tracks.csv", sep=";")
+        meta_tracks_by_song = dict(list(df_meta_tracks.groupby("song_id", sort=False)))
+
+        def make_song(meta_song: pd.Series, executor: Optional[Executor] = None) -> Song:
+            logger.info(f"Adding song {meta_song['song_id']}...")
+            return Song(song_dir=self.root_dir / meta_song["song_id"],
+                        composer=meta_song["composer"],
+                        title=meta_song["title"],
+                        year=meta_song["year"],
+                        df_meta_tracks=meta_tracks_by_song.get(meta_song["song_id"], df_meta_tracks.iloc[0:0]),
+                        executor=executor)
+
+        meta_songs = [cur_meta_song for _, cur_meta_song in df_meta_songs.iterrows()]
+
+        if self.workers <= 1:
+            self.songs = [make_song(cur_meta_song) for cur_meta_song in meta_songs]
+            return
+
+        # songs are created concurrently and submit their file probes to a shared pool,
+        # so all probes of the dataset are in flight at the same time.
+        # Two separate pools avoid song tasks blocking the workers their probes wait for.
+        with ThreadPoolExecutor(max_workers=self.workers) as probe_executor, \
+             ThreadPoolExecutor(max_workers=self.workers) as song_executor:
+            self.songs = list(song_executor.map(lambda cur_meta_song: make_song(cur_meta_song, probe_executor),
+                                                meta_songs))
+
+
+CATALOG_COLUMNS = [
+    # Columns of the track catalog (`SongDB.catalog`).
+    "song_id",
+    "voice",
+    "instrument",
+    "instrument_type",
+    "performer",
+    "room",
+    "microphone",
+    "date",
+    "num_channels",
+    "sample_rate",
+    "frames",
+    "duration",
+] + TRACK_PATH_FIELDS
+
+
+def _tracks_to_frame(tracks: list[Track]) -> pd.DataFrame:
+    """Build a columnar table of track attributes."""
+    columns = {
+        "song_id": [cur_track.song_id for cur_track in tracks],
+        "voice": np.array([cur_track.voice for cur_track in tracks], dtype=int),
+        "instrument": [cur_track.instrument.value for cur_track in tracks],
+        "instrument_type": [_enum_value(cur_track.instrument_type) for cur_track in tracks],
+        "performer": [cur_track.performer for cur_track in tracks],
+        "room": [cur_track.room for cur_track in tracks],
+        "microphone": [cur_track.microphone for cur_track in tracks],
+        "date": pd.to_datetime([cur_track.date for cur_track in tracks], format="%Y-%m-%d", errors="coerce"),
+        "num_channels": np.array([cur_track.num_channels for cur_track in tracks], dtype=int),
+        "sample_rate": np.array([cur_track.sample_rate for cur_track in tracks], dtype=int),
+        "frames": np.array([cur_track.min_samples for cur_track in tracks], dtype=np.int64),
+    }
+    columns["duration"] = columns["frames"] / np.maximum(columns["sample_rate"], 1)
+
+    for cur_field in TRACK_PATH_FIELDS:
+        columns[cur_field] = [getattr(cur_track, cur_field) for cur_track in tracks]
+
+    return pd.DataFrame(columns, columns=CATALOG_COLUMNS)
+
+
+def _enum_value(value: Any) -> Any:
+    return value.value if value is not None else None
+
+
+def _to_builtin(value: Any) -> Any:
+    """Convert numpy scalars (e.g. from pandas rows) to Python builtins."""
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
 
 
 class Ensemble(ABC):
@@ -273,89 +774,270 @@ class Ensemble(ABC):
 
 
 class EnsembleRandom(Ensemble):
-    def __init__(self, song: Song):
-        self.song = copy.deepcopy(song)
+    """
+    Random ensemble with one track per voice.
+
+    The selection is stored as indices into the tracks of the source song, which is shared, not copied.
+
+    Attributes:
+        source_song (Song): Song to draw the ensemble from.
+        song (Song): Song holding only the selected tracks (built on first access).
+        rng (Optional[np.random.Generator]): Random generator, defaults to numpy's global random state.
+        track_choice_ids (list[int]): Indices of the selected tracks in `source_song.tracks`, ordered by voice.
+    """
+    def __init__(self, song: Song, rng: Optional[np.random.Generator] = None):
+        self.source_song = song
+        self.rng = rng
+        self.track_choice_ids: list[int] = []
+        self._song: Optional[Song] = None
         self.filter_tracks()
 
+    @property
+    def song(self) -> Song:
+        if self._song is None:
+            self._song = Song(song_dir=self.source_song.song_dir,
+                              title=self.source_song.title,
+                              composer=self.source_song.composer,
+                              year=self.source_song.year,
+                              tracks=self.get_tracks())
+        return self._song
+
     def get_tracks(self) -> list[Track]:
-        return self.song.tracks
+        tracks = self.source_song.tracks
+        return [tracks[i] for i in self.track_choice_ids]
 
     def filter_tracks(self):
-        # copy of the song with randomly fitered tracks
-        logger.info(f"Track selection in {self.song.id}")
-
-        voices: list[int] = [cur_track.voice for cur_track in self.song.tracks]
-        track_choice_ids: list[int] = []
+        logger.info(f"Track selection in {self.source_song.id}")
 
         # for each voice, draw a track
-        for cur_voice in set(voices):
-            candidate_idcs: np.array = np.where(np.asarray(voices) == cur_voice)[0]
-            choice_id: int = int(np.random.choice(candidate_idcs, size=1))
-            track_choice_ids.append(choice_id)
+        track_choice_ids: list[int] = []
+        for cur_voice in self.source_song.voices:
+            candidate_idcs = self.source_song.get_track_ids_by_voice(cur_voice)
+            if self.rng is None:
+                choice = np.random.randint(len(candidate_idcs))
+            else:
+                choice = self.rng.integers(len(candidate_idcs))
+            track_choice_ids.append(candidate_idcs[int(choice)])
 
-        # collate tracks
-        self.song.tracks = [self.song.tracks[i] for i in track_choice_ids]
+        self.track_choice_ids = track_choice_ids
+        self._song = None
 
 
 class EnsemblePermutations(Ensemble):
-    def __init__(self, song: Song):
+    """
+    All ensembles of a song, i.e., the cartesian product of the tracks per voice.
+
+    The ensembles are not materialized: an integer index is decoded into one track per voice
+    by mixed-radix arithmetic (the last voice varies fastest), so memory stays O(#voices).
+    Supports negative indices and slices.
+
+    Attributes:
+        song (Song): Song to build the ensembles from.
+        track_filter (Optional[Callable[[Track], bool]]): Only tracks passing the filter are used.
+    """
+    def __init__(self, song: Song, track_filter: Optional[Callable[[Track], bool]] = None):
         self.song = song
+        self.track_filter = track_filter
         self.ensembles = list()
         self.tracks_by_voice: dict = dict()
 
         self._categorize_tracks_byvoices()
 
-        # getting all the permutations as a cartesian product of all tracks
-        # Note: Converting it to a list might get big, if more data is stored
-        self._permutations: list[tuple[int]] = list(product(*self.tracks_by_voice.values()))
+        # radices of the mixed-radix representation of an ensemble index
+        self._buckets: list[list[int]] = list(self.tracks_by_voice.values())
+        self._len: int = math.prod(len(cur_bucket) for cur_bucket in self._buckets)
 
     def _categorize_tracks_byvoices(self):
         """
         Categorize the voices in the respective bucket 1, 2, 3, or 4, based on the filename.
         """
-        # for each track, get the associated voice
-        voices: list[int] = [cur_track.voice for cur_track in self.song.tracks]
-
-        # for each voice, collect the track object and add to the list in the dict
-        for cur_voice in set(voices):
-            candidate_idcs: np.array = np.where(np.asarray(voices) == cur_voice)[0]
-
-            # init list in the list which will hold the objects
-            self.tracks_by_voice[str(cur_voice)] = list()
-
-            for cur_idc in candidate_idcs:
-                self.tracks_by_voice[str(cur_voice)].append(cur_idc)
+        tracks = self.song.tracks
+        for cur_voice in self.song.voices:
+            self.tracks_by_voice[str(cur_voice)] = [
+                cur_idx for cur_idx in self.song.get_track_ids_by_voice(cur_voice)
+                if self.track_filter is None or self.track_filter(tracks[cur_idx])
+            ]
 
     def filter_tracks(self, track_choice_ids):
         """
         Filter the tracks based on the chosen ensemble permutation.
         """
         # collate tracks
-        return [self.song.tracks[i] for i in track_choice_ids]
+        tracks = self.song.tracks
+        return [tracks[i] for i in track_choice_ids]
+
+    def get_track_choice_ids(self, index: int) -> tuple[int, ...]:
+        """
+        Decode an ensemble index into the indices of the selected tracks (one per voice).
+        """
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError(f"Index '{index}' is out of range.")
+
+        track_choice_ids = []
+        for cur_bucket in reversed(self._buckets):
+            index, cur_digit = divmod(index, len(cur_bucket))
+            track_choice_ids.append(cur_bucket[cur_digit])
 
-    def __getitem__(self, index) -> list[Track]:
-        track_choice_ids = self._permutations[index]
+        return tuple(reversed(track_choice_ids))
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[list[Track], list[list[Track]]]:
+        if isinstance(index, slice):
+            return [self[cur_index] for cur_index in range(*index.indices(self._len))]
+
+        track_choice_ids = self.get_track_choice_ids(index)
 
         # filter the tracks to the permuation selection
         selected_tracks = self.filter_tracks(track_choice_ids=track_choice_ids)
 
         logger.info(
             f"Returning ensemble: "
-            f"{selected_tracks[0].instrument}, "
-            f"{selected_tracks[1].instrument}, "
-            f"{selected_tracks[2].instrument}, "
-            f"{selected_tracks[3].instrument}"
+            f"{', '.join(str(cur_track.instrument) for cur_track in selected_tracks)}"
         )
 
         return selected_tracks
 
+    def __iter__(self) -> Iterator[list[Track]]:
+        for cur_index in range(self._len):
+            yield self[cur_index]
+
     def __len__(self):
-        return len(self._permutations)
+        return self._len
 
     def __repr__(self):
         return f"Indexed instrument permutations with {len(self)} items."
 
 
+class EnsembleIndex:
+    """
+    Index over the ensembles of all songs in a dataset.
+
+    A global integer maps to a song and one track per voice. The per-song ensembles are
+    `EnsemblePermutations`, located by a binary search over the prefix sums of their counts.
+
+    Attributes:
+        songs (list[Song]): Songs to build the ensembles from (e.g. a `SongDB`).
+        track_filter (Optional[Callable[[Track], bool]]): Only tracks passing the filter are used,
+            e.g. `filter_instrument_type(InstrumentType.BRASS)`.
+        ensemble_filter (Optional[Callable[[list[Track]], bool]]): Only ensembles passing the filter are used,
+            e.g. `no_repeated_instrument`. Requires enumerating all ensembles once, the indices of
+            the valid ensembles are stored per song.
+    """
+    def __init__(self,
+                 songs: Union["SongDB", list[Song]],
+                 track_filter: Optional[Callable[[Track], bool]] = None,
+                 ensemble_filter: Optional[Callable[[list[Track]], bool]] = None):
+        self.songs: list[Song] = list(songs.songs if isinstance(songs, SongDB) else songs)
+        self.track_filter = track_filter
+        self.ensemble_filter = ensemble_filter
+
+        self.permutations: list[EnsemblePermutations] = [
+            EnsemblePermutations(cur_song, track_filter=track_filter) for cur_song in self.songs
+        ]
+
+        # local indices of the ensembles passing the ensemble filter
+        self._valid_ids: Optional[list[np.ndarray]] = None
+        if ensemble_filter is not None:
+            self._valid_ids = [
+                np.array([cur_idx for cur_idx in range(len(cur_perms)) if ensemble_filter(cur_perms[cur_idx])],
+                         dtype=np.int64)
+                for cur_perms in self.permutations
+            ]
+            counts = [len(cur_valid_ids) for cur_valid_ids in self._valid_ids]
+        else:
+            counts = [len(cur_perms) for cur_perms in self.permutations]
+
+        self.counts: np.ndarray = np.asarray(counts, dtype=np.int64)
+        self.offsets: list[int] = [0] + list(itertools.accumulate(counts))
+
+    def __len__(self):
+        return self.offsets[-1]
+
+    def __repr__(self):
+        return f"Ensemble index with {len(self)} items over {len(self.songs)} songs."
+
+    def locate(self, index: int) -> tuple[int, int]:
+        """
+        Map a global index to the song index and the index into the song's `EnsemblePermutations`.
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Index '{index}' is out of range.")
+
+        song_idx = bisect.bisect_right(self.offsets, index) - 1
+        local_idx = index - self.offsets[song_idx]
+        if self._valid_ids is not None:
+            local_idx = int(self._valid_ids[song_idx][local_idx])
+
+        return song_idx, local_idx
+
+    def __getitem__(self, index: int) -> tuple[Song, list[Track]]:
+        song_idx, local_idx = self.locate(index)
+        return self.songs[song_idx], self.permutations[song_idx][local_idx]
+
+    def __iter__(self) -> Iterator[tuple[Song, list[Track]]]:
+        for cur_index in range(len(self)):
+            yield self[cur_index]
+
+    def sample(self,
+               num_samples: int,
+               rng: Optional[np.random.Generator] = None,
+               stratify: bool = True) -> np.ndarray:
+        """
+        Draw global ensemble indices at random without replacement.
+
+        Arguments
+        ---------
+        num_samples : int
+            Number of indices to draw (at most `len(self)`).
+        rng : np.random.Generator, optional
+            Random generator, a new unseeded one is used if not given.
+        stratify : bool
+            Allocate the samples to the songs proportionally to their number of ensembles
+            (largest remainder method) and draw within each song.
+
+        Returns
+        -------
+        indices : np.ndarray
+            Global indices in random order.
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        if not 0 <= num_samples <= len(self):
+            raise ValueError(f"Cannot draw {num_samples} samples from {len(self)} ensembles without replacement.")
+
+        if not stratify:
+            return rng.choice(len(self), size=num_samples, replace=False)
+
+        # proportional allocation per song
+        quotas = num_samples * self.counts / max(len(self), 1)
+        allocation = np.floor(quotas).astype(np.int64)
+        remainder = num_samples - allocation.sum()
+        allocation[np.argsort(allocation - quotas, kind="stable")[:remainder]] += 1
+
+        indices = [
+            self.offsets[cur_song_idx] + rng.choice(self.counts[cur_song_idx], size=cur_num, replace=False)
+            for cur_song_idx, cur_num in enumerate(allocation) if cur_num > 0
+        ]
+        indices = np.concatenate(indices) if indices else np.zeros(0, dtype=np.int64)
+        rng.shuffle(indices)
+
+        return indices
+
+
+def filter_instrument_type(instrument_type: Union[InstrumentType, str]) -> Callable[[Track], bool]:
+    """Track filter accepting only tracks of the given instrument type, see `EnsembleIndex`."""
+    instrument_type = InstrumentType(instrument_type)
+    return lambda track: track.instrument_type == instrument_type
+
+
+def no_repeated_instrument(tracks: list[Track]) -> bool:
+    """Ensemble filter rejecting ensembles with an instrument in more than one voice, see `EnsembleIndex`."""
+    return len({cur_track.instrument for cur_track in tracks}) == len(tracks)
+
+
 class Mixer(ABC):
     """
     Abstract Base Class for a mixer.
@@ -372,13 +1054,25 @@ class MixerSimple(Mixer):
     """
     Simple track mixer.
 
+    The mix is accumulated in place into a single preallocated buffer (float32 by default),
+    sized from the number of frames in the track metadata. Tracks are read from the opened
+    audio store if it contains them (see `choralebricks.store`), otherwise from the audio cache or the files.
+
     Attributes:
         tracks (list[Track]): List of associated multi-tracks.
         gains (Optional[list[float]]): Gain levels (in dB) per track (defaults to 0 dB if not provided).
+        length (str): Policy for tracks with different numbers of frames,
+            "shortest" truncates the mix to the shortest track, "longest" pads shorter tracks with zeros.
+        dtype (str): Floating point type used for reading, mixing, and the output ("float32" or "float64").
+        target_sr (Optional[int]): Sample rate of the mix, tracks with other sample rates are resampled
+            (see `Track.audio`). Defaults to the sample rate of the tracks.
     """
     def __init__(self,
                  tracks: list[Track],
-                 gains: Optional[list[float]] = None):
+                 gains: Optional[list[float]] = None,
+                 length: str = "shortest",
+                 dtype: str = "float32",
+                 target_sr: Optional[int] = None):
         self.tracks = tracks
 
         if gains is None:
@@ -388,11 +1082,18 @@ class MixerSimple(Mixer):
 
         self.gains = np.asarray(self.gains)
 
+        if length not in ["shortest", "longest"]:
+            raise ValueError(f"Unknown length policy '{length}', use 'shortest' or 'longest'.")
+        self.length = length
 
-    def get_mix(self):
-        """Mix tracks together by sum(tracks)/num_tracks"""
-        logger.info("Mixing...")
-        track_audio = []
+        if np.dtype(dtype) not in [np.float32, np.float64]:
+            raise ValueError(f"Unsupported dtype '{dtype}', use 'float32' or 'float64'.")
+        self.dtype = np.dtype(dtype)
+        self.target_sr = target_sr
+
+    def _get_samplerate(self) -> int:
+        if self.target_sr is not None:
+            return self.target_sr
 
         track_samplerates = [cur_track.sample_rate for cur_track in self.tracks]
         try:
@@ -400,20 +1101,342 @@ class MixerSimple(Mixer):
         except AssertionError:
             logger.error("Not all track samplerates are equal!")
 
-        for cur_track in self.tracks:
-            audio, _ = sf.read(cur_track.path_audio)
-            track_audio.append(audio)
+        return track_samplerates[0]
+
+    def _get_weights(self) -> np.ndarray:
+        # gain per track, all equal amplitude from original file
+        return 10 ** (self.gains / 20) / len(self.tracks)
+
+    def _get_frame_range(self,
+                         start: Optional[float] = None,
+                         duration: Optional[float] = None,
+                         unit: str = "seconds") -> tuple[int, int]:
+        """Convert an excerpt to the first frame and the number of frames (-1 for until the end)."""
+        if start is None:
+            start = 0
+
+        if unit == "samples":
+            start_frame = int(start)
+            num_frames = -1 if duration is None else int(duration)
+        elif unit == "seconds":
+            samplerate = self._get_samplerate()
+            start_frame = int(round(start * samplerate))
+            num_frames = -1 if duration is None else int(round(duration * samplerate))
+        elif unit == "measures":
+            # the tracks are synchronous, the first one provides the alignment
+            track = self.tracks[0]
+            end = start if duration is None else start + duration
+            start_sec, end_sec = measures_to_seconds([start, end], track.path_sheet_music_csv, track.path_notes,
+                                                     track.voice)
+            samplerate = self._get_samplerate()
+            start_frame = int(round(start_sec * samplerate))
+            num_frames = -1 if duration is None else int(round(end_sec * samplerate)) - start_frame
+        else:
+            raise ValueError(f"Unknown unit '{unit}', use 'seconds', 'samples', or 'measures'.")
+
+        if start_frame < 0 or (duration is not None and num_frames < 0):
+            raise ValueError("Start and duration of the excerpt must not be negative.")
+
+        return start_frame, num_frames
+
+    def _get_num_frames(self, start_frame: int, num_frames: int) -> int:
+        """Number of frames of the mix according to the track metadata and the length policy."""
+        track_frames = [max(self._get_track_frames(cur_track) - start_frame, 0) for cur_track in self.tracks]
+        mix_frames = min(track_frames) if self.length == "shortest" else max(track_frames)
+
+        if num_frames >= 0:
+            mix_frames = min(mix_frames, num_frames)
 
-        # TODO: tracks could differ in samples, we assume that the start position is correct
-        # quick fix: Take shortest number of samples from all tracks
-        track_audio = np.asarray(track_audio)
-        track_audio = (10 ** (self.gains / 20))[:, np.newaxis] * track_audio
-        track_audio = track_audio / track_audio.shape[0]  # all equal amplitude from original file
+        return mix_frames
 
-        self.mix = np.sum(track_audio, axis=0)
+    def _needs_resampling(self, track: Track) -> bool:
+        return self.target_sr is not None and track.sample_rate != self.target_sr
+
+    def _get_track_frames(self, track: Track) -> int:
+        """Number of frames of a track at the sample rate of the mix."""
+        if self._needs_resampling(track):
+            return resampled_length(track.min_samples, track.sample_rate, self.target_sr)
+        return track.min_samples
+
+    def _get_frame_shape(self) -> tuple[int, ...]:
+        num_channels = self.tracks[0].num_channels
+        return () if num_channels <= 1 else (num_channels,)
+
+    def _read_track(self, track: Track, start_frame: int, out: np.ndarray) -> np.ndarray:
+        """Read up to `len(out)` frames of a track into `out`, returns the filled part.
+
+        Tracks contained in the opened audio store (see `choralebricks.store`) are copied from the store
+        instead of decoding the file.
+        """
+        store = current_store()
+        in_store = store is not None and track in store
+
+        if self._needs_resampling(track):
+            # resampling requires floating point samples, other stores are bypassed
+            excerpt = track.audio(start=start_frame, frames=len(out), dtype=out.dtype.name,
+                                  mmap=in_store and store.dtype == out.dtype, target_sr=self.target_sr)
+            out[:len(excerpt)] = excerpt
+            return out[:len(excerpt)]
+
+        if in_store:
+            excerpt = store.get(track, start=start_frame, frames=len(out))
+            out[:len(excerpt)] = excerpt
+            if np.issubdtype(store.dtype, np.integer):
+                # PCM samples, scaled like libsndfile does for float output
+                out[:len(excerpt)] *= 1 / -np.iinfo(store.dtype).min
+            return out[:len(excerpt)]
+
+        if AUDIO_CACHE.enabled:
+            excerpt = AUDIO_CACHE.get(track.path_audio, dtype=out.dtype.name)[start_frame:start_frame + len(out)]
+            out[:len(excerpt)] = excerpt
+            return out[:len(excerpt)]
+
+        with sf.SoundFile(track.path_audio) as f:
+            f.seek(min(start_frame, f.frames))
+            return f.read(len(out), out=out)
+
+    def get_mix(self,
+                start: Optional[float] = None,
+                duration: Optional[float] = None,
+                unit: str = "seconds",
+                return_tracks: bool = True):
+        """
+        Mix tracks together by sum(tracks)/num_tracks
+
+        Optionally, only an excerpt is mixed. The track files are seeked to the start position,
+        so only the frames of the excerpt are read.
+
+        Arguments
+        ---------
+        start : float, optional
+            Start of the excerpt, defaults to the beginning of the tracks.
+        duration : float, optional
+            Length of the excerpt, defaults to the end of the tracks.
+        unit : str
+            Unit of `start` and `duration`: "seconds", "samples", or "measures".
+            Measure positions are converted with the sheet music and note annotations
+            of the first track (see `choralebricks.utils.measures_to_seconds`).
+        return_tracks : bool
+            Also return the scaled tracks (as one array of shape (#tracks, #frames)).
+            If False, only one track buffer is held in memory at a time.
+        """
+        logger.info("Mixing...")
+
+        samplerate = self._get_samplerate()
+        start_frame, num_frames = self._get_frame_range(start, duration, unit)
+        num_frames = self._get_num_frames(start_frame, num_frames)
+        weights = self._get_weights()
+
+        # tracks are read directly into preallocated buffers and scaled in place
+        self.mix = np.zeros((num_frames, *self._get_frame_shape()), dtype=self.dtype)
+        if return_tracks:
+            track_audio = np.zeros((len(self.tracks), *self.mix.shape), dtype=self.dtype)
+        else:
+            track_audio = None
+            buffer = np.empty_like(self.mix)
+
+        for cur_idx, (cur_track, cur_weight) in enumerate(zip(self.tracks, weights)):
+            cur_buffer = track_audio[cur_idx] if return_tracks else buffer
+            cur_audio = self._read_track(cur_track, start_frame, out=cur_buffer)
+
+            np.multiply(cur_audio, cur_weight, out=cur_audio)
+            self.mix[:len(cur_audio)] += cur_audio
+
+        # Check for clipping
+        if self.mix.size and ((self.mix.min() < -1.0) or (self.mix.max() > 1.0)):
+            logger.warning("Clipping detected in output mix. Please check the gains.")
+
+        return {"MIX": self.mix, "TRACKS": track_audio, "SAMPLERATE": samplerate}
+
+    def iter_mix(self,
+                 blocksize: int = 65536,
+                 start: Optional[float] = None,
+                 duration: Optional[float] = None,
+                 unit: str = "seconds") -> Iterator[np.ndarray]:
+        """
+        Mix tracks block-wise, yielding blocks of `blocksize` frames (the last one may be shorter).
+
+        Only one block per track is held in memory, independent of the track length.
+        The number of frames follows the length policy (see `MixerSimple`).
+        An excerpt can be selected with `start`, `duration`, and `unit` (see `get_mix`).
+        Tracks which need resampling are resampled block-wise, each block with the surrounding
+        source frames the filter requires (see `Track.audio`), so the blocks equal the mix of `get_mix`.
+        """
+        logger.info("Mixing block-wise...")
+        weights = self._get_weights()
+        start_frame, num_frames = self._get_frame_range(start, duration, unit)
+        frames_left = self._get_num_frames(start_frame, num_frames)
+        frame_shape = self._get_frame_shape()
+        store = current_store()
+        clipping = False
+
+        with contextlib.ExitStack() as stack:
+            # tracks to resample or contained in the opened audio store are read per block by `_read_track`
+            files = [None if self._needs_resampling(cur_track) or (store is not None and cur_track in store)
+                     else stack.enter_context(sf.SoundFile(cur_track.path_audio)) for cur_track in self.tracks]
+            for cur_file in files:
+                if cur_file is not None:
+                    cur_file.seek(min(start_frame, cur_file.frames))
+            buffer = np.empty((blocksize, *frame_shape), dtype=self.dtype)
+            cur_start = start_frame
+
+            while frames_left > 0:
+                cur_num_frames = min(blocksize, frames_left)
+                mix = np.zeros((cur_num_frames, *frame_shape), dtype=self.dtype)
+
+                for cur_track, cur_file, cur_weight in zip(self.tracks, files, weights):
+                    if cur_file is None:
+                        cur_block = self._read_track(cur_track, cur_start, out=buffer[:cur_num_frames])
+                    else:
+                        cur_block = cur_file.read(cur_num_frames, out=buffer[:cur_num_frames])
+                    np.multiply(cur_block, cur_weight, out=cur_block)
+                    mix[:len(cur_block)] += cur_block
+
+                clipping = clipping or (mix.min() < -1.0) or (mix.max() > 1.0)
+                cur_start += cur_num_frames
+                frames_left -= cur_num_frames
+                yield mix
 
         # Check for clipping
-        if (self.mix.min() < -1.0) or (self.mix.max() > 1.0):
+        if clipping:
             logger.warning("Clipping detected in output mix. Please check the gains.")
 
-        return {"MIX": self.mix, "TRACKS": track_audio, "SAMPLERATE": track_samplerates[0]}
+    def write_mix(self,
+                  path: Union[str, Path],
+                  blocksize: int = 65536,
+                  subtype: Optional[str] = None,
+                  **kwargs) -> int:
+        """
+        Stream the mix block-wise to an audio file, see `iter_mix`.
+
+        Arguments
+        ---------
+        path : str or Path
+            Output path, the format is derived from the suffix.
+        blocksize : int
+            Number of frames mixed and written at once.
+        subtype : str, optional
+            Subtype of the output file (e.g. "PCM_16"), defaults to the format's default.
+        kwargs
+            Excerpt selection passed to `iter_mix` (`start`, `duration`, `unit`).
+
+        Returns
+        -------
+        num_frames : int
+            Number of frames written.
+        """
+        num_frames = 0
+
+        with sf.SoundFile(path, "w", samplerate=self._get_samplerate(), channels=self.tracks[0].num_channels,
+                          subtype=subtype) as f:
+            for cur_block in self.iter_mix(blocksize=blocksize, **kwargs):
+                f.write(cur_block)
+                num_frames += len(cur_block)
+
+        return num_frames
+
+
+class MixerBatch(MixerSimple):
+    """
+    Mixer for many gain settings of the same tracks.
+
+    The tracks are read once (and kept for subsequent calls with the same excerpt),
+    K mixes are computed as a single matrix product of the gain matrix (K x #tracks)
+    with the tracks (#tracks x #frames).
+
+    Attributes:
+        tracks (list[Track]): List of associated multi-tracks.
+        length (str): Length policy, see `MixerSimple`.
+        dtype (str): Floating point type, see `MixerSimple`.
+        target_sr (Optional[int]): Sample rate of the mixes, see `MixerSimple`.
+    """
+    def __init__(self,
+                 tracks: list[Track],
+                 length: str = "shortest",
+                 dtype: str = "float32",
+                 target_sr: Optional[int] = None):
+        super().__init__(tracks, gains=None, length=length, dtype=dtype, target_sr=target_sr)
+        self._track_audio: Optional[np.ndarray] = None
+        self._track_audio_range: Optional[tuple[int, int]] = None
+
+    def load_tracks(self,
+                    start: Optional[float] = None,
+                    duration: Optional[float] = None,
+                    unit: str = "seconds") -> np.ndarray:
+        """
+        Read the (unscaled) tracks into an array of shape (#tracks, #frames[, #channels]).
+
+        The result is kept, so repeated calls with the same excerpt do not read the files again.
+        See `MixerSimple.get_mix` for the excerpt arguments.
+        """
+        start_frame, num_frames = self._get_frame_range(start, duration, unit)
+        num_frames = self._get_num_frames(start_frame, num_frames)
+
+        if self._track_audio_range != (start_frame, num_frames):
+            track_audio = np.zeros((len(self.tracks), num_frames, *self._get_frame_shape()), dtype=self.dtype)
+            for cur_track, cur_buffer in zip(self.tracks, track_audio):
+                self._read_track(cur_track, start_frame, out=cur_buffer)
+
+            self._track_audio = track_audio
+            self._track_audio_range = (start_frame, num_frames)
+
+        return self._track_audio
+
+    def get_mixes(self,
+                  gains: np.ndarray,
+                  envelopes: Optional[np.ndarray] = None,
+                  start: Optional[float] = None,
+                  duration: Optional[float] = None,
+                  unit: str = "seconds") -> np.ndarray:
+        """
+        Compute K mixes of the tracks in one pass, each by sum(gain * track)/num_tracks.
+
+        Arguments
+        ---------
+        gains : np.ndarray
+            Gain levels in dB of shape (K, #tracks).
+        envelopes : np.ndarray, optional
+            Linear gain envelopes applied to the tracks on top of `gains`,
+            either shared by all mixes (#tracks, #frames) or per mix (K, #tracks, #frames).
+        start, duration, unit
+            Excerpt selection, see `MixerSimple.get_mix`.
+
+        Returns
+        -------
+        mixes : np.ndarray
+            Array of shape (K, #frames[, #channels]).
+        """
+        track_audio = self.load_tracks(start=start, duration=duration, unit=unit)
+        num_tracks, num_frames = track_audio.shape[:2]
+
+        gains = np.atleast_2d(np.asarray(gains))
+        if gains.shape[1] != num_tracks:
+            raise ValueError(f"Gains must have shape (K, {num_tracks}), got {gains.shape}.")
+        weights = (10 ** (gains / 20) / num_tracks).astype(self.dtype)
+
+        # flatten channels, so a mix is a single matrix product over the track axis
+        tracks_flat = track_audio.reshape(num_tracks, -1)
+
+        if envelopes is None:
+            mixes = weights @ tracks_flat
+        else:
+            envelopes = np.asarray(envelopes, dtype=self.dtype)
+            if envelopes.shape[-2:] != (num_tracks, num_frames):
+                raise ValueError(f"Envelopes must have shape ([K,] {num_tracks}, {num_frames}), got {envelopes.shape}.")
+            num_mixes = envelopes.shape[:-2]
+            if track_audio.ndim == 3:
+                envelopes = envelopes[..., np.newaxis]
+            envelopes = np.broadcast_to(envelopes, num_mixes + track_audio.shape).reshape(*num_mixes, num_tracks, -1)
+
+            if envelopes.ndim == 2:
+                mixes = weights @ (envelopes * tracks_flat)
+            else:
+                mixes = np.einsum("kt,ktn,tn->kn", weights, envelopes, tracks_flat)
+
+        mixes = mixes.reshape(gains.shape[0], *track_audio.shape[1:])
+
+        # Check for clipping
+        if mixes.size and ((mixes.min() < -1.0) or (mixes.max() > 1.0)):
+            logger.warning("Clipping detected in output mixes. Please check the gains.")
+
+        return mixes
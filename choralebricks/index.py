@@ -0,0 +1,151 @@
+"""Persistent on-disk index of a ChoraleBricks dataset.
+
+Building a `SongDB` parses the metadata CSVs and probes the header of every
+audio file. The index stores the result of this scan as a versioned JSON file
+together with a checksum and a fingerprint (modification time and size) of all
+files involved, so that subsequent constructions can skip the scan entirely.
+"""
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+
+METADATA_FILES = ["metadata_songs.csv", "metadata_tracks.csv"]
+
+
+def default_index_path(root_dir: Union[str, Path]) -> Path:
+    """Location of the index file for a dataset in the user cache directory.
+
+    The cache directory is taken from `XDG_CACHE_HOME` (defaults to `~/.cache`).
+    One index file per dataset root is stored, identified by a hash of the resolved root path.
+    """
+    cache_dir = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "choralebricks"
+    root_hash = hashlib.sha1(str(Path(root_dir).resolve()).encode("utf-8")).hexdigest()[:16]
+    return cache_dir / f"index-{root_hash}.json"
+
+
+def _stat(path: Path) -> Optional[list[int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def compute_fingerprint(root_dir: Path, songs: list[dict]) -> dict:
+    """Modification time and size of all files the index depends on.
+
+    Covers the metadata CSVs, the audio file of every track,
+    and the annotation folder of every song (to notice added or removed F0/note files).
+    Paths are stored relative to `root_dir`.
+    """
+    paths = [root_dir / cur_file for cur_file in METADATA_FILES]
+
+    for cur_song in songs:
+        paths.append(root_dir / cur_song["song_id"] / "annotations")
+        for cur_track in cur_song["tracks"]:
+            paths.append(Path(cur_track["path_audio"]))
+
+    fingerprint = dict()
+    for cur_path in paths:
+        try:
+            cur_key = str(cur_path.relative_to(root_dir))
+        except ValueError:
+            cur_key = str(cur_path)
+        fingerprint[cur_key] = _stat(cur_path)
+
+    return fingerprint
+
+
+def _checksum(payload: dict) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def write_index(path: Union[str, Path], root_dir: Path, songs: list[dict]) -> bool:
+    """Write the index file atomically.
+
+    Arguments
+    ---------
+    path : str or Path
+        Target path of the index file.
+    root_dir : Path
+        Root directory of the dataset.
+    songs : list[dict]
+        Song records, each holding the song metadata and a list of track records under `tracks`.
+
+    Returns
+    -------
+    success : bool
+        False if the index could not be written (e.g. read-only location).
+    """
+    path = Path(path)
+    payload = {
+        "version": INDEX_VERSION,
+        "root_dir": str(root_dir.resolve()),
+        "fingerprint": compute_fingerprint(root_dir, songs),
+        "songs": songs,
+    }
+    content = {"checksum": _checksum(payload), **payload}
+
+    path_tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path_tmp, "w", encoding="utf-8") as f:
+            json.dump(content, f)
+        os.replace(path_tmp, path)
+    except OSError as exc:
+        logger.warning(f"Could not write dataset index {path}: {exc}")
+        path_tmp.unlink(missing_ok=True)
+        return False
+
+    logger.info(f"Wrote dataset index {path}.")
+    return True
+
+
+def read_index(path: Union[str, Path], root_dir: Path) -> Optional[list[dict]]:
+    """Read the index file and check that it is still valid.
+
+    The index is rejected if it does not exist, cannot be decoded, has a different version,
+    a wrong checksum, belongs to another root directory, or if any of the fingerprinted files changed.
+
+    Returns
+    -------
+    songs : list[dict] or None
+        Song records as passed to `write_index`, or None if the index is missing or stale.
+    """
+    path = Path(path)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            content = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as exc:
+        logger.warning(f"Could not read dataset index {path}: {exc}")
+        return None
+
+    checksum = content.pop("checksum", None)
+
+    if content.get("version") != INDEX_VERSION:
+        logger.info(f"Dataset index {path} has an outdated version.")
+        return None
+
+    if checksum != _checksum(content):
+        logger.warning(f"Dataset index {path} is corrupted (checksum mismatch).")
+        return None
+
+    if content["root_dir"] != str(root_dir.resolve()):
+        logger.info(f"Dataset index {path} belongs to a different root directory.")
+        return None
+
+    for cur_key, cur_stat in content["fingerprint"].items():
+        if _stat(root_dir / cur_key) != cur_stat:
+            logger.info(f"Dataset index {path} is stale ({cur_key} changed).")
+            return None
+
+    return content["songs"]
@@ -0,0 +1,193 @@
+"""Shared-memory dataset mode for multi-process data loading.
+
+Without it, every dataloader worker builds its own `SongDB` and decodes (and caches) its own audio.
+`SharedSongDB` is created once in the parent process. It writes the scanned catalog and,
+optionally, the decoded audio of all tracks into `multiprocessing.shared_memory` segments.
+Workers `attach` to the segments by name and get a `SongDB` without accessing the dataset folder.
+With shared audio, `Track.audio(mmap=True)` returns zero-copy views into the shared segment,
+so the decoded dataset is held in memory once instead of once per worker.
+
+Examples
+--------
+>>> shared = SharedSongDB(SongDB(), audio=True)  # parent process
+>>> cbdb = attach(shared.name)  # worker, e.g. in the `worker_init_fn` of a dataloader
+>>> shared.close()  # parent process, after all workers finished
+"""
+import json
+import logging
+import os
+import struct
+import sys
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional
+
+import numpy as np
+
+from .dataset import SongDB
+from .store import STORE_DTYPES, AudioStore, close_store, pack_layout, pack_tracks, set_store
+
+logger = logging.getLogger(__name__)
+
+SHARED_VERSION = 1
+
+# the catalog segment starts with the length of the JSON payload
+_HEADER = struct.Struct("<Q")
+
+# segments attached by this process, kept open as long as the attached dataset is in use
+_ATTACHED_SEGMENTS = []
+
+
+def _tracker_id() -> Optional[int]:
+    """Identity of the resource tracker this process reports to (inode of its pipe), None if it is not running.
+
+    Processes started by `multiprocessing` (fork, spawn, forkserver) inherit the pipe of their parent's tracker.
+    Only used before Python 3.13 on POSIX, where the tracker has no public API to identify it.
+    """
+    try:
+        fd = resource_tracker._resource_tracker._fd
+    except AttributeError:
+        raise RuntimeError("Cannot identify the resource tracker of this Python version, "
+                           "shared datasets are not supported.") from None
+    if fd is None:
+        return None
+    try:
+        return os.fstat(fd).st_ino
+    except OSError:
+        return None
+
+
+def _attach_segment(name: str) -> SharedMemory:
+    # the creating process is responsible for unlinking the segments
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    return SharedMemory(name=name)
+
+
+def _untrack_segment(segment: SharedMemory, owner_tracker: Optional[int]):
+    # before Python 3.13, attaching registers the segment with the resource tracker, which unlinks it
+    # when the process exits. A process sharing the owner's tracker (e.g. a spawned worker) must keep
+    # the registration, it is the owner's one. Other processes remove their own registration.
+    if sys.version_info >= (3, 13) or os.name != "posix":
+        return
+    if owner_tracker is not None and _tracker_id() == owner_tracker:
+        return
+    # segments are registered under their POSIX name, `SharedMemory.name` strips the leading slash
+    resource_tracker.unregister("/" + segment.name, "shared_memory")
+
+
+class SharedSongDB:
+    """
+    Owner of the shared-memory segments holding a dataset.
+
+    Parameters
+    ----------
+    songdb : SongDB
+        Dataset to share.
+    audio : bool
+        Also decode the audio of all tracks into shared memory.
+    dtype : str
+        Data type of the shared samples: "float32" or "int16".
+
+    Attributes:
+        name (str): Name of the catalog segment, workers pass it to `attach`.
+    """
+
+    def __init__(self, songdb: SongDB, audio: bool = False, dtype: str = "float32"):
+        if dtype not in STORE_DTYPES:
+            raise ValueError(f"Unknown dtype {dtype}, choose from {STORE_DTYPES}.")
+
+        self._audio_segment = None
+        content = {
+            "version": SHARED_VERSION,
+            "root_dir": str(songdb.root_dir),
+            "songs": [cur_song.to_record() for cur_song in songdb.songs],
+            "audio": None,
+        }
+
+        if audio:
+            tracks = [cur_track for cur_song in songdb.songs for cur_track in cur_song.tracks]
+            entries, num_samples = pack_layout(tracks)
+            itemsize = np.dtype(dtype).itemsize
+            self._audio_segment = SharedMemory(create=True, size=max(num_samples * itemsize, 1))
+            pack_tracks(tracks, entries, np.ndarray((num_samples,), dtype=dtype, buffer=self._audio_segment.buf))
+            content["audio"] = {"name": self._audio_segment.name, "dtype": dtype,
+                                "num_samples": num_samples, "tracks": entries}
+
+        # workers sharing the resource tracker of this process keep the registration of the segments
+        content["tracker"] = None
+        if os.name == "posix" and sys.version_info < (3, 13):
+            resource_tracker.ensure_running()
+            content["tracker"] = _tracker_id()
+
+        payload = json.dumps(content).encode("utf-8")
+        self._catalog_segment = SharedMemory(create=True, size=_HEADER.size + len(payload))
+        self._name = self._catalog_segment.name
+        _HEADER.pack_into(self._catalog_segment.buf, 0, len(payload))
+        self._catalog_segment.buf[_HEADER.size:_HEADER.size + len(payload)] = payload
+
+        logger.info(f"Shared dataset {self.name} ({len(content['songs'])} songs, audio: {audio}).")
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def __repr__(self):
+        return f"<SharedSongDB {self.name}, audio: {self._audio_segment is not None}>"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Release and remove the segments. Workers must not use the shared dataset afterwards.
+
+        Calling it again has no effect.
+        """
+        for cur_segment in (self._catalog_segment, self._audio_segment):
+            if cur_segment is None:
+                continue
+            cur_segment.close()
+            cur_segment.unlink()
+        self._catalog_segment = None
+        self._audio_segment = None
+
+
+def attach(name: str) -> SongDB:
+    """
+    Dataset from the shared-memory segments created by `SharedSongDB`.
+
+    If the audio was shared, it is used for `Track.audio(mmap=True)` in this process
+    (see `choralebricks.store`).
+    """
+    catalog_segment = _attach_segment(name)
+    (num_bytes,) = _HEADER.unpack_from(catalog_segment.buf, 0)
+    content = json.loads(bytes(catalog_segment.buf[_HEADER.size:_HEADER.size + num_bytes]))
+    _untrack_segment(catalog_segment, content.get("tracker"))
+    catalog_segment.close()
+
+    if content.get("version") != SHARED_VERSION:
+        raise ValueError(f"Shared dataset {name} has an unsupported version.")
+
+    audio: Optional[dict] = content["audio"]
+    if audio is not None:
+        audio_segment = _attach_segment(audio["name"])
+        _untrack_segment(audio_segment, content.get("tracker"))
+        _ATTACHED_SEGMENTS.append(audio_segment)
+        samples = np.ndarray((audio["num_samples"],), dtype=audio["dtype"], buffer=audio_segment.buf)
+        samples.flags.writeable = False
+        set_store(AudioStore(samples, audio["tracks"]))
+
+    return SongDB.from_records(content["root_dir"], content["songs"])
+
+
+def detach():
+    """Stop using the attached audio and close the segments in this process.
+
+    All arrays returned by `Track.audio(mmap=True)` must be released before.
+    """
+    close_store()
+    while _ATTACHED_SEGMENTS:
+        _ATTACHED_SEGMENTS.pop().close()
@@ -0,0 +1,199 @@
+"""Packed, memory-mapped store of the track audio.
+
+Decoding the WAV files through libsndfile on every access dominates the cost of data loading.
+`build_store` decodes all tracks of a `SongDB` once and packs their samples into a single
+`.npy` file (float32 or int16) together with a JSON index of the offset, number of frames,
+and number of channels of every track.
+
+After `open_store`, `Track.audio(mmap=True)` returns views into the memory-mapped file.
+Slicing an excerpt costs no copy, and forked dataloader workers share the pages through
+the OS page cache.
+"""
+import json
+import logging
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+import soundfile as sf
+
+logger = logging.getLogger(__name__)
+
+STORE_VERSION = 1
+
+STORE_DTYPES = ("float32", "int16")
+
+AUDIO_FILE = "audio.npy"
+
+INDEX_FILE = "index.json"
+
+
+def track_key(track) -> str:
+    """Key of a track in the store, independent of the location of the dataset."""
+    return f"{track.song_id}/{Path(track.path_audio).name}"
+
+
+def pack_layout(tracks: list) -> tuple[dict, int]:
+    """
+    Offsets of tracks packed back to back (frames of multi-channel tracks are interleaved).
+
+    Returns
+    -------
+    entries : dict
+        Offset, number of frames, and number of channels per track key (see `track_key`).
+    num_samples : int
+        Total number of samples.
+    """
+    entries = dict()
+    offset = 0
+    for cur_track in tracks:
+        entries[track_key(cur_track)] = {"offset": offset,
+                                         "frames": cur_track.min_samples,
+                                         "channels": cur_track.num_channels}
+        offset += cur_track.min_samples * cur_track.num_channels
+
+    return entries, offset
+
+
+def pack_tracks(tracks: list, entries: dict, out: np.ndarray):
+    """Decode tracks into a flat buffer according to the layout of `pack_layout`."""
+    for cur_track in tracks:
+        logger.info(f"Packing track: {cur_track.path_audio}...")
+        cur_entry = entries[track_key(cur_track)]
+        cur_out = out[cur_entry["offset"]:cur_entry["offset"] + cur_entry["frames"] * cur_entry["channels"]]
+        with sf.SoundFile(cur_track.path_audio) as f:
+            cur_frames = f.read(cur_entry["frames"], dtype=out.dtype.name, always_2d=True)
+        cur_out[:cur_frames.size] = cur_frames.ravel()
+
+
+def build_store(songdb, out_dir: Union[str, Path], dtype: str = "float32") -> Path:
+    """
+    Decode all tracks of a dataset and pack them into a store.
+
+    Arguments
+    ---------
+    songdb : SongDB
+        Dataset whose tracks are packed.
+    out_dir : str or Path
+        Output directory, receives `audio.npy` and `index.json`.
+    dtype : str
+        Data type of the stored samples: "float32" or "int16" (PCM samples without conversion).
+
+    Returns
+    -------
+    out_dir : Path
+        Directory of the store.
+    """
+    if dtype not in STORE_DTYPES:
+        raise ValueError(f"Unknown dtype {dtype}, choose from {STORE_DTYPES}.")
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    tracks = [cur_track for cur_song in songdb.songs for cur_track in cur_song.tracks]
+    entries, num_samples = pack_layout(tracks)
+
+    audio = np.lib.format.open_memmap(out_dir / AUDIO_FILE, mode="w+", dtype=dtype, shape=(num_samples,))
+    pack_tracks(tracks, entries, audio)
+    audio.flush()
+    del audio
+
+    with open(out_dir / INDEX_FILE, "w", encoding="utf-8") as f:
+        json.dump({"version": STORE_VERSION, "dtype": dtype, "tracks": entries}, f)
+
+    logger.info(f"Wrote audio store {out_dir} ({num_samples} samples).")
+    return out_dir
+
+
+class AudioStore:
+    """
+    Read-only view of packed track audio, see `build_store`.
+
+    Attributes:
+        audio (np.ndarray): Flat buffer of all samples (memory-mapped file or shared memory).
+        tracks (dict): Offset, number of frames, and number of channels per track key.
+        path (Path): Directory of the store, None if not backed by a file.
+        dtype (np.dtype): Data type of the stored samples.
+    """
+
+    def __init__(self, audio: np.ndarray, tracks: dict, path: Optional[Path] = None):
+        self.audio = audio
+        self.tracks = tracks
+        self.path = path
+        self.dtype = audio.dtype
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "AudioStore":
+        """Memory-map a store written by `build_store`."""
+        path = Path(path)
+
+        with open(path / INDEX_FILE, "r", encoding="utf-8") as f:
+            content = json.load(f)
+
+        if content.get("version") != STORE_VERSION:
+            raise ValueError(f"Audio store {path} has an unsupported version, please rebuild it.")
+
+        return cls(np.load(path / AUDIO_FILE, mmap_mode="r"), content["tracks"], path=path)
+
+    def __len__(self):
+        return len(self.tracks)
+
+    def __contains__(self, track) -> bool:
+        return track_key(track) in self.tracks
+
+    def __repr__(self):
+        return f"<AudioStore {self.path}, #Tracks: {len(self)}, dtype: {self.dtype}>"
+
+    def get(self, track, start: int = 0, frames: int = -1) -> np.ndarray:
+        """
+        Samples of a track as a view into the store (no copy).
+
+        Returns
+        -------
+        audio : np.ndarray
+            Read-only samples of shape (#frames,) for mono or (#frames, #channels) for multi-channel tracks.
+        """
+        try:
+            entry = self.tracks[track_key(track)]
+        except KeyError:
+            raise KeyError(f"Track {track_key(track)} is not contained in the audio store.") from None
+
+        num_frames, num_channels = entry["frames"], entry["channels"]
+        audio = self.audio[entry["offset"]:entry["offset"] + num_frames * num_channels]
+        if num_channels > 1:
+            audio = audio.reshape(num_frames, num_channels)
+
+        return audio[start:(start + frames) if frames >= 0 else None]
+
+
+_STORE: Optional[AudioStore] = None
+
+
+def open_store(path: Union[str, Path]) -> AudioStore:
+    """Open a store and use it for `Track.audio(mmap=True)` in this process."""
+    return set_store(AudioStore.load(path))
+
+
+def set_store(store: AudioStore) -> AudioStore:
+    """Use a store for `Track.audio(mmap=True)` in this process."""
+    global _STORE
+    _STORE = store
+    return _STORE
+
+
+def close_store():
+    """Stop using the currently opened store."""
+    global _STORE
+    _STORE = None
+
+
+def get_store() -> AudioStore:
+    """Currently opened store, raises a RuntimeError if none was opened."""
+    if _STORE is None:
+        raise RuntimeError("No audio store opened, see `choralebricks.store.open_store`.")
+    return _STORE
+
+
+def current_store() -> Optional[AudioStore]:
+    """Currently opened store, None if none was opened."""
+    return _STORE
@@ -1,3 +1,6 @@
+import math
+from functools import lru_cache
+
 import numpy as np
 import pandas as pd
 from pathlib import Path
@@ -166,6 +169,106 @@ def read_chords(path_csv: Path) -> pd.DataFrame:
     return df
 
 
+def measures_to_seconds(
+    measures,
+    path_sheet_music_csv: Path,
+    path_notes: Path,
+    voice: int
+) -> np.ndarray:
+    """Convert measure positions to seconds for a recorded voice.
+
+    The note events of the voice in the sheet music are aligned 1-1 to the annotated notes
+    of the recording (naive alignment). Positions between note onsets are interpolated linearly.
+    """
+    sheet_music = read_sheet_music_csv(path_sheet_music_csv).sort_values("start_meas")
+    sheet_music = sheet_music[sheet_music["part"] == voice_to_name(voice)]
+    notes = read_notes(path_notes).sort_values("t_start")
+
+    if sheet_music.shape[0] != notes.shape[0]:
+        raise ValueError(
+            f"Number of notes in sheet music ({sheet_music.shape[0]}) and annotations ({notes.shape[0]}) differ."
+        )
+
+    return np.interp(measures, sheet_music["start_meas"].values, notes["t_start"].values)
+
+
+def resample_factors(sr_in: int, sr_out: int) -> tuple[int, int]:
+    """Up- and downsampling factors (up, down) of a polyphase resampler from `sr_in` to `sr_out`."""
+    divisor = math.gcd(int(sr_in), int(sr_out))
+    return int(sr_out) // divisor, int(sr_in) // divisor
+
+
+@lru_cache(maxsize=32)
+def resample_filter(up: int, down: int) -> np.ndarray:
+    """Anti-aliasing FIR filter of a polyphase resampler, designed once per (up, down) pair.
+
+    Same design as the default of `scipy.signal.resample_poly` (Kaiser window, beta=5).
+    """
+    # scipy.signal is imported on first use, it dominates the import time of the package
+    from scipy.signal import firwin
+
+    max_rate = max(up, down)
+    half_len = 10 * max_rate
+    h = firwin(2 * half_len + 1, 1.0 / max_rate, window=("kaiser", 5.0))
+    h.flags.writeable = False
+    return h
+
+
+def resampled_length(num_frames: int, sr_in: int, sr_out: int) -> int:
+    """Number of frames after resampling `num_frames` frames from `sr_in` to `sr_out`."""
+    up, down = resample_factors(sr_in, sr_out)
+    return -(-num_frames * up // down)
+
+
+def resample_window(start: int, frames: int, sr_in: int, sr_out: int) -> tuple[int, int, int]:
+    """Source frames required to resample an excerpt equal to the same part of the resampled track.
+
+    The excerpt starts at `start` and has `frames` frames (-1 until the end) at `sr_out`.
+    The source excerpt starts on the polyphase grid (a multiple of the downsampling factor)
+    and covers the support of the filter on both sides.
+
+    Returns
+    -------
+    src_start : int
+        First source frame.
+    src_frames : int
+        Number of source frames, -1 until the end.
+    offset : int
+        Number of leading frames to drop from the resampled source excerpt.
+    """
+    up, down = resample_factors(sr_in, sr_out)
+    # half length of the filter in frames of the upsampled signal
+    half_len = len(resample_filter(up, down)) // 2
+
+    # source blocks of `down` frames correspond to `up` output frames
+    block = max((start * down - half_len) // (up * down), 0)
+    src_start = block * down
+    offset = start - block * up
+    if frames < 0:
+        return src_start, -1, offset
+
+    src_end = ((start + frames) * down + half_len) // up + 1
+    return src_start, src_end - src_start, offset
+
+
+def resample(audio: np.ndarray, sr_in: int, sr_out: int) -> np.ndarray:
+    """Resample audio of shape (#frames,) or (#frames, #channels) with a polyphase filter.
+
+    The filter design is cached per pair of sample rates (see `resample_filter`).
+    Returns `audio` itself if the sample rates are equal.
+    """
+    if sr_in == sr_out:
+        return audio
+
+    if not np.issubdtype(audio.dtype, np.floating):
+        raise ValueError(f"Resampling requires floating point samples, got {audio.dtype}.")
+
+    from scipy.signal import resample_poly
+
+    up, down = resample_factors(sr_in, sr_out)
+    return resample_poly(audio, up, down, axis=0, window=resample_filter(up, down)).astype(audio.dtype, copy=False)
+
+
 def voice_to_name(voice_value: int) -> str:
     # Mapping from Voices enum to strings
     try:
@@ -0,0 +1,26 @@
+"""
+    Pack the audio of all ChoraleBricks tracks into a memory-mapped store.
+    Afterwards, `Track.audio(mmap=True)` reads from the store instead of decoding the WAV files.
+"""
+import argparse
+import logging
+from pathlib import Path
+
+from choralebricks.dataset import SongDB
+from choralebricks.store import build_store
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("out_dir", type=Path, help="Output directory of the store.")
+    parser.add_argument("--dtype", default="float32", choices=["float32", "int16"])
+    args = parser.parse_args()
+
+    cbdb = SongDB()
+    build_store(cbdb, args.out_dir, dtype=args.dtype)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -7,7 +7,6 @@ from pathlib import Path
 import os
 import pandas as pd
 import numpy as np
-import soundfile as sf
 import matplotlib.pyplot as plt
 from matplotlib.patches import Patch
 import matplotlib
@@ -25,7 +24,10 @@ logger = logging.getLogger(__name__)
 
 def collect_data(cbdb):
     df_songs = []
-    df_tracks = []
+
+    # track statistics come directly from the catalog (no need to probe the audio files again)
+    df_tracks = cbdb.to_frame()
+    df_tracks = df_tracks.rename(columns={"duration": "audio_dur"})
 
     # collect data for statistics
     for cur_song in cbdb.songs:
@@ -38,31 +40,11 @@ def collect_data(cbdb):
         cur_ensembles = EnsemblePermutations(cur_song)
         cur_song_info["n_permutations"] = len(cur_ensembles)
 
-        cur_track_durs = list()
-
-        for cur_track in cur_song.tracks:
-            cur_track_wav_info = sf.info(cur_track.path_audio)
-
-            cur_track_info = dict()
-            cur_track_info["song_id"] = cur_track.song_id
-            cur_track_info["voice"] = cur_track.voice
-            cur_track_info["instrument"] = cur_track.instrument.value
-            cur_track_info["instrument_type"] = cur_track.instrument_type.value
-            cur_track_info["performer"] = cur_track.performer
-            cur_track_info["room"] = cur_track.room
-            cur_track_info["microphone"] = cur_track.microphone
-            cur_track_info["date"] = cur_track.date
-            cur_track_info["audio_dur"] = cur_track_wav_info.duration
-            cur_track_durs.append(cur_track_wav_info.duration)
-
-            df_tracks.append(cur_track_info)
-
-        cur_song_info["min_dur"] = min(cur_track_durs)
         df_songs.append(cur_song_info)
 
     df_songs = pd.DataFrame(df_songs)
-    df_tracks = pd.DataFrame(df_tracks)
-    df_tracks["date"] = pd.to_datetime(df_tracks["date"], format="%Y-%m-%d")
+    min_durs = df_tracks.groupby("song_id")["audio_dur"].min()
+    df_songs["min_dur"] = df_songs["song_id"].map(min_durs)
 
     return df_songs, df_tracks
 
@@ -4,7 +4,6 @@
 """
 import logging
 from pathlib import Path
-import soundfile as sf
 import numpy as np
 
 from choralebricks.dataset import SongDB, EnsembleRandom, MixerSimple
@@ -29,16 +28,9 @@ def main():
         # Draw random gains...
         random_gains = np.random.uniform(-6, 6, size=4)
 
-        # Mix it...
+        # Mix it and stream the output to disk...
         cur_ensembles_mix = MixerSimple(cur_tracks, gains=random_gains)
-        cur_ensembles_mix = cur_ensembles_mix.get_mix()
-
-        # Write output.
-        sf.write(
-            path_mixes / f"{cur_song.id}.wav",
-            data=cur_ensembles_mix["MIX"],
-            samplerate=cur_ensembles_mix["SAMPLERATE"]
-        )
+        cur_ensembles_mix.write_mix(path_mixes / f"{cur_song.id}.wav")
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
@@ -83,16 +83,19 @@ def main():
     f0_et = np.zeros_like(t_f0)
     f0_ji = np.zeros_like(t_f0)
 
+    # interval of each note to the root of its chord (-1 for N.C.)
+    intervals = chord_seq.interval_to_root(score.start_meas.to_numpy(), score.pitch.to_numpy())
+    ji_offsets = np.where(intervals >= 0, ji_offset[intervals], 0)
+
     i = 0
     for _, row in score.iterrows():
         assert row.pitch == np.round(choralebricks.utils.hz2midi(notes[i,1], f_ref=442)).astype(int)
-        chord = chord_seq.get_chord_at(row.start_meas)
         mask = ((t_f0 >= notes[i,0]) & (t_f0 <= (notes[i,0] + notes[i,2])))
         # extend mask a bit for smoother synthesis
         mask = maximum_filter1d(mask, 11, mode='constant', cval=0)
 
         f0_et[mask] = choralebricks.utils.midi2hz(row.pitch, f_ref=442)
-        f0_ji[mask] = choralebricks.utils.midi2hz(row.pitch + ji_offset[chord.get_interval(row.pitch)], f_ref=442)
+        f0_ji[mask] = choralebricks.utils.midi2hz(row.pitch + ji_offsets[i], f_ref=442)
         i += 1
 
 
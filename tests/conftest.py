@@ -14,6 +14,8 @@ import os
 
 import pytest
 
+from benchmarks.synthetic import write_synthetic_db
+
 
 def pytest_collection_modifyitems(config, items):
     """Ignore tests if CHORALEDB_PATH is not set."""
@@ -26,3 +28,26 @@ def pytest_collection_modifyitems(config, items):
         target_file = "test_data.py"
 
         items[:] = [item for item in items if target_file not in str(item.fspath)]
+
+
+SYNTHETIC_SONGS = {
+    # Song ID -> list of (voice, instrument) of the available tracks.
+    "Composer_SongA": [(1, "tp"), (1, "cl"), (2, "fh"), (2, "cl"), (3, "bar"), (4, "tba"), (4, "bcl")],
+    "Composer_SongB": [(1, "fl"), (2, "tp"), (3, "tb"), (3, "ts"), (4, "tba")],
+}
+
+
+@pytest.fixture
+def synthetic_root(tmp_path, monkeypatch):
+    """Root directory of a small synthetic dataset (index files are written to a temporary cache dir)."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    return write_synthetic_db(tmp_path / "ChoraleBricks", SYNTHETIC_SONGS, sample_rate=8000, num_samples=8000,
+                              samples_step=100, seed=42)
+
+
+@pytest.fixture
+def synthetic_root_44k(tmp_path, monkeypatch):
+    """Root directory of a synthetic dataset with one song at 44.1 kHz (non-integer ratio to 16 kHz)."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    return write_synthetic_db(tmp_path / "ChoraleBricks44k", {"Composer_SongA": SYNTHETIC_SONGS["Composer_SongA"]},
+                              sample_rate=44100, num_samples=44100, seed=42)
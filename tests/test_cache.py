@@ -0,0 +1,108 @@
+"""
+All tests related to the decoded-audio cache.
+"""
+import os
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from choralebricks import cache
+from choralebricks.cache import AudioCache
+from choralebricks.dataset import EnsemblePermutations, MixerSimple, SongDB
+
+
+@pytest.fixture
+def audio_cache(monkeypatch):
+    """Enabled process-level cache, restored after the test."""
+    monkeypatch.setattr(cache.AUDIO_CACHE, "_max_bytes", 2**20)
+    cache.AUDIO_CACHE.clear()
+    yield cache.AUDIO_CACHE
+    cache.AUDIO_CACHE.clear()
+
+
+def test_cache_hits_and_eviction(synthetic_root):
+    """Entries are served from the cache and evicted least recently used first"""
+    tracks = SongDB(synthetic_root, use_index=False)["Composer_SongA"].tracks[:3]
+    audio_cache = AudioCache(max_bytes=2 * 8000 * 4)
+
+    audio = audio_cache.get(tracks[0].path_audio)
+    assert not audio.flags.writeable
+    np.testing.assert_array_equal(audio, sf.read(tracks[0].path_audio, dtype="float32")[0])
+    assert audio_cache.get(tracks[0].path_audio) is audio
+
+    audio_cache.get(tracks[1].path_audio)
+    audio_cache.get(tracks[0].path_audio)
+    audio_cache.get(tracks[2].path_audio)
+    assert audio_cache.stats == {"hits": 2, "misses": 3, "evictions": 1, "entries": 2, "bytes": 2 * 8000 * 4,
+                                 "max_bytes": 2 * 8000 * 4}
+
+    # track 1 was least recently used
+    audio_cache.get(tracks[1].path_audio)
+    assert audio_cache.misses == 4
+
+    # a different data type is a different entry, too large entries are not stored
+    audio_cache.get(tracks[0].path_audio, dtype="float64")
+    assert audio_cache.misses == 5 and audio_cache.num_bytes <= audio_cache.max_bytes
+
+    audio_cache.max_bytes = 0
+    assert len(audio_cache) == 0 and audio_cache.num_bytes == 0
+
+
+def test_cache_invalidated_by_mtime(synthetic_root):
+    """Changed files are decoded again"""
+    path_audio = SongDB(synthetic_root, use_index=False)["Composer_SongA"].tracks[0].path_audio
+    audio_cache = AudioCache(max_bytes=2**20)
+
+    audio_cache.get(path_audio)
+    stat = path_audio.stat()
+    os.utime(path_audio, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    audio_cache.get(path_audio)
+
+    assert audio_cache.misses == 2
+
+
+def test_cache_used_by_tracks_and_mixer(synthetic_root, audio_cache):
+    """Track loading and mixing share the cache and give the same results"""
+    song = SongDB(synthetic_root, use_index=False)["Composer_SongA"]
+    tracks = EnsemblePermutations(song)[0]
+    audio_cache.max_bytes = 0
+    mix_uncached = MixerSimple(tracks).get_mix(start=0.25, duration=0.5)["MIX"]
+    audio_cache.max_bytes = 2**20
+
+    mix = MixerSimple(tracks).get_mix(start=0.25, duration=0.5)["MIX"]
+    assert audio_cache.misses == len(tracks)
+    np.testing.assert_array_equal(mix, mix_uncached)
+
+    audio = tracks[0].audio(start=100, frames=10)
+    assert audio_cache.misses == len(tracks) and audio_cache.hits == 1
+    np.testing.assert_array_equal(audio, sf.read(tracks[0].path_audio, start=100, frames=10, dtype="float32")[0])
+
+    MixerSimple(tracks).get_mix()
+    assert audio_cache.hits == 1 + len(tracks)
+
+
+def test_cache_resampled(synthetic_root, audio_cache):
+    """Resampled tracks are cached next to the original ones"""
+    track = SongDB(synthetic_root, use_index=False)["Composer_SongA"].tracks[0]
+
+    audio = track.audio(target_sr=16000)
+    assert audio.shape == (16000,)
+    track.audio()
+    np.testing.assert_array_equal(track.audio(start=10, frames=5, target_sr=16000), audio[10:15])
+    assert audio_cache.misses == 2 and audio_cache.hits == 1
+
+
+def test_cache_resampled_excerpts(synthetic_root_44k, audio_cache):
+    """Excerpts resampled on their own equal the excerpts of the cached resampled tracks"""
+    tracks = EnsemblePermutations(SongDB(synthetic_root_44k, use_index=False)["Composer_SongA"])[0]
+    audio_cache.max_bytes = 0
+    excerpt_uncached = tracks[0].audio(start=12345, frames=4000, target_sr=16000)
+    mix_uncached = MixerSimple(tracks, target_sr=16000).get_mix(start=12345, duration=4000, unit="samples")["MIX"]
+    audio_cache.max_bytes = 2**22
+
+    np.testing.assert_allclose(tracks[0].audio(start=12345, frames=4000, target_sr=16000), excerpt_uncached,
+                               atol=1e-6)
+    mix = MixerSimple(tracks, target_sr=16000).get_mix(start=12345, duration=4000, unit="samples")["MIX"]
+    assert audio_cache.misses == len(tracks)
+    np.testing.assert_allclose(mix, mix_uncached, atol=1e-6)
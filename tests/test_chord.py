@@ -1,10 +1,15 @@
 """Test parsing chords in Harte notation
 """
+import subprocess
+import sys
+
 import pytest
 
 import numpy as np
 
-from choralebricks import Chord
+from choralebricks import Chord, ChordSequence
+from choralebricks.chord import (INTERVAL_STEPS, PARSER_BACKENDS, SHORTHAND_STEPS, chord_cache_clear, chord_cache_info,
+                                 parse_harte)
 
 def test_chords():
     # test the chord parser
@@ -29,4 +34,96 @@ def test_chords():
     assert np.array_equal(c.get_interval_to_bass(midi), np.array([1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 0]))
 
     c = Chord("X")
-    assert c.is_nc() == True
\ No newline at end of file
+    assert c.is_nc() == True
+
+def test_chord_cache():
+    # repeated labels share one immutable chord object
+    chord_cache_clear()
+
+    c = Chord.from_harte("G:7")
+    assert Chord.from_harte("G:7") is c
+    assert Chord.from_harte("D:maj") is not c
+    assert c.relative_steps == (0, 4, 7, 10)
+    assert chord_cache_info().hits == 1 and chord_cache_info().misses == 2
+
+    with pytest.raises(AttributeError):
+        c.root = 0
+
+    seq = ChordSequence(np.array([0.0, 1.0]), np.array([1.0, 2.0]), [c, Chord.from_harte("D:maj")])
+    assert seq.get_chord_at(2.5) is seq.get_chord_at(3.5)
+    assert seq.get_chord_at(2.5).is_nc()
+
+
+def test_parser_backends():
+    # the hand-written parser agrees with the Lark reference on all shorthands and degrees
+    roots = [n + m for n in "ABCDEFG" for m in ["", "#", "b", "##"]]
+    degrees = [x + m + i for x in ["", "*"] for m in ["", "b", "#", "bb"] for i in INTERVAL_STEPS]
+
+    labels = ["N", "X", " X "]
+    labels += [r + s for r in roots for s in [""] + [":" + sh for sh in SHORTHAND_STEPS]]
+    labels += [f"C:maj({d})" for d in degrees] + [f"Eb:({d},3)" for d in degrees] + [f"G:min7/{d}" for d in degrees]
+    labels += ["F# : hdim7 ( *b3 , 9 ) / b7", "Bb:7(*1,b9,#11)/3"]
+
+    for label in labels:
+        assert parse_harte(label, backend="fast") == parse_harte(label, backend="lark"), label
+
+    for label in ["", "H:maj", "C:foo", "C:maj(3", "N:maj", "C/", "C:(1 3)"]:
+        for backend in PARSER_BACKENDS:
+            with pytest.raises(Exception):
+                parse_harte(label, backend=backend)
+
+    with pytest.raises(ValueError):
+        parse_harte("C:maj", backend="regex")
+
+    assert Chord("C:maj(*5,13)").relative_steps == (0, 4, 9)
+
+
+def test_chord_sequence_lookup():
+    # vectorized lookup agrees with a linear scan over the bounds
+    starts = np.array([3.0, 0.0, 1.0, 5.0, 5.0])
+    ends = np.array([5.0, 1.0, 2.5, 5.0, 6.0])
+    chords = [Chord.from_harte(s) for s in ["G:7", "C:maj", "D:min", "E:min", "A:min"]]
+    seq = ChordSequence(starts, ends, chords)
+
+    positions = np.linspace(-1, 7, 161)
+    expected = [next((i for i in range(len(chords)) if starts[i] <= p < ends[i]), -1) for p in positions]
+    assert np.array_equal(seq.chord_indices_at(positions), expected)
+    assert seq.chord_indices_at(5.0) == 4 and seq.chord_indices_at(2.75) == -1
+
+    assert seq.get_chord_at(1.5) is chords[2]
+    assert [c.harte for c in seq.get_chord_at([0.5, 2.75, 3.0])] == ["C:maj", "X", "G:7"]
+
+    with pytest.raises(AssertionError):
+        ChordSequence(np.array([0.0, 1.0]), np.array([1.5, 2.0]), chords[:2])
+
+
+def test_chord_sequence_batched():
+    # batched membership and intervals agree with the per-chord methods
+    labels = ["C:maj", "G:7/3", "A:min7", "F#:(*1,3,5,b7)/5", "Bb:sus4(9)", "X"]
+    chords = [Chord.from_harte(s) for s in labels]
+    seq = ChordSequence(np.arange(len(labels), dtype=float), np.arange(1, len(labels) + 1, dtype=float), chords)
+
+    rng = np.random.default_rng(0)
+    positions = rng.uniform(0, len(labels) + 1, size=2000)
+    midi = rng.integers(36, 84, size=2000)
+
+    is_chord_note = seq.is_chord_note(positions, midi)
+    intervals = seq.interval_to_root(positions, midi)
+    for p, m, member, interval in zip(positions, midi, is_chord_note, intervals):
+        c = seq.get_chord_at(p)
+        if c.is_nc():
+            assert not member and interval == -1
+        else:
+            assert member == c.is_chord_note(m) and interval == c.get_interval(m)
+
+    # broadcasting: one position for many pitches
+    assert np.array_equal(seq.is_chord_note(0.5, np.arange(60, 72)), chords[0].is_chord_note(np.arange(60, 72)))
+
+
+def test_lazy_parser():
+    # importing the package neither builds the Lark parser nor imports plotting or signal processing
+    code = ("import sys, choralebricks; "
+            "assert choralebricks.chord.get_lark_parser.cache_info().currsize == 0; "
+            "assert 'matplotlib.pyplot' not in sys.modules and 'scipy.signal' not in sys.modules; "
+            "assert choralebricks.chord.HarteChord.parse('G:7')['relative_steps'] == [0, 4, 7, 10]")
+    subprocess.run([sys.executable, "-c", code], check=True)
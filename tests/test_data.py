@@ -6,7 +6,7 @@ import pandas as pd
 import pytest
 import soundfile as sf
 
-from choralebricks.dataset import EnsemblePermutations, SongDB
+from choralebricks.dataset import EnsembleIndex, SongDB
 from choralebricks.utils import read_f0_sv, read_f0, read_notes, read_chords
 from choralebricks import ChordSequence
 
@@ -46,7 +46,7 @@ def songs(choralebricks):
 @pytest.fixture
 def ensembles(choralebricks):
     """All Possible Ensemble Permutations"""
-    return [ens for song in choralebricks.songs for ens in EnsemblePermutations(song)]
+    return EnsembleIndex(choralebricks)
 
 
 """
@@ -1,12 +1,22 @@
 """
 All tests related to dataset.py and the involved logic.
 """
+import dataclasses
+import itertools
+import threading
+import time
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
 import pytest
+import soundfile as sf
 
-from choralebricks.constants import Instrument
-from choralebricks.dataset import EnsemblePermutations, Song, Track
+from choralebricks.constants import Instrument, InstrumentType
+import choralebricks.dataset
+from choralebricks.dataset import (EnsembleIndex, EnsemblePermutations, EnsembleRandom, MixerBatch, MixerSimple, Song,
+                                   SongDB, Track, TrackModel, filter_instrument_type, no_repeated_instrument)
+from choralebricks.utils import resample
 
 
 @pytest.fixture
@@ -76,3 +86,448 @@ def test_import_my_module():
         import choralebricks.dataset
     except ImportError:
         pytest.fail("Importing my_module failed")
+
+
+def test_metadata_tracks_read_once(synthetic_root, monkeypatch):
+    """SongDB reads the track metadata once, not once per song"""
+    read_csv = choralebricks.dataset.pd.read_csv
+    paths_read = []
+
+    def read_csv_counted(path, *args, **kwargs):
+        paths_read.append(Path(path).name)
+        return read_csv(path, *args, **kwargs)
+
+    monkeypatch.setattr(choralebricks.dataset.pd, "read_csv", read_csv_counted)
+    cbdb = SongDB(synthetic_root, use_index=False)
+
+    assert len(cbdb) == 2
+    assert paths_read.count("metadata_tracks.csv") == 1
+
+
+def test_song_standalone(synthetic_root):
+    """A song can still be loaded without a SongDB"""
+    cbdb = SongDB(synthetic_root, use_index=False)
+    song = Song(synthetic_root / "Composer_SongA")
+
+    assert song.tracks == cbdb["Composer_SongA"].tracks
+
+
+def test_songdb_workers_order(synthetic_root):
+    """Parallel probing gives the same songs and tracks in the same order"""
+    cbdb_serial = SongDB(synthetic_root, use_index=False)
+    cbdb_parallel = SongDB(synthetic_root, use_index=False, workers=4)
+
+    assert [s.id for s in cbdb_parallel.songs] == [s.id for s in cbdb_serial.songs]
+    for cur_song_serial, cur_song_parallel in zip(cbdb_serial.songs, cbdb_parallel.songs):
+        assert cur_song_parallel.tracks == cur_song_serial.tracks
+
+
+def test_songdb_workers_concurrency(synthetic_root, monkeypatch):
+    """With workers, file probes run concurrently"""
+    sf_info = choralebricks.dataset.sf.info
+    lock = threading.Lock()
+    num_running = 0
+    max_running = 0
+
+    def sf_info_slow(path):
+        nonlocal num_running, max_running
+        with lock:
+            num_running += 1
+            max_running = max(max_running, num_running)
+        time.sleep(0.05)
+        with lock:
+            num_running -= 1
+        return sf_info(path)
+
+    monkeypatch.setattr(choralebricks.dataset.sf, "info", sf_info_slow)
+    SongDB(synthetic_root, use_index=False, workers=16)
+
+    assert max_running > 1
+
+
+def test_songdb_lazy(synthetic_root, monkeypatch):
+    """Lazy songs probe their audio files on first access only"""
+    sf_info = choralebricks.dataset.sf.info
+    paths_probed = []
+
+    def sf_info_counted(path):
+        paths_probed.append(path)
+        return sf_info(path)
+
+    monkeypatch.setattr(choralebricks.dataset.sf, "info", sf_info_counted)
+    cbdb = SongDB(synthetic_root, lazy=True)
+
+    assert len(cbdb) == 2
+    assert len(paths_probed) == 0
+
+    song = cbdb["Composer_SongB"]
+    assert len(song) == 5
+    assert len(paths_probed) == 5
+    assert song["03_tb"].instrument == Instrument.TROMBONE
+
+    # other songs are still untouched
+    assert len(paths_probed) == 5
+    assert [t for t in cbdb[0]] == SongDB(synthetic_root, use_index=False)[0].tracks
+
+
+def test_track_lookups(mockupdb):
+    """Lookups by key, voice, and instrument"""
+    song = mockupdb[0]
+
+    assert song["01_cl"].instrument == Instrument.CLARINET
+    assert song["4_tba"].voice == 4
+    assert [t.instrument for t in song.get_tracks_by_voice(2)] == [Instrument.TRUMPET, Instrument.CLARINET]
+    assert [t.voice for t in song.get_tracks_by_instrument(Instrument.BARITONE)] == [3, 4]
+    assert song.get_tracks_by_instrument("tp") == song.get_tracks_by_instrument(Instrument.TRUMPET)
+
+    with pytest.raises(KeyError):
+        song["03_tp"]
+    with pytest.raises(KeyError):
+        song["03_xyz"]
+    with pytest.raises(KeyError):
+        song["tp"]
+
+
+def test_lookup_benchmark():
+    """Micro-benchmark: hash lookups are much faster than a linear scan over the tracks"""
+    instruments = list(Instrument)
+    song = Song(Path("song_bench"))
+    song.tracks = [
+        Track(song_id="song_bench", path_audio=f"{i}.wav", voice=i // len(instruments),
+              instrument=instruments[i % len(instruments)])
+        for i in range(50 * len(instruments))
+    ]
+    keys = [f"{t.voice:02d}_{t.instrument.value}" for t in song.tracks]
+
+    def linear_scan(key):
+        voice, inst = key.split("_")
+        for track in song.tracks:
+            if int(track.voice) == int(voice) and track.instrument.value == inst:
+                return track
+
+    start = time.perf_counter()
+    for key in keys:
+        linear_scan(key)
+    dur_scan = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for key in keys:
+        song[key]
+    dur_lookup = time.perf_counter() - start
+
+    assert all(song[key] is linear_scan(key) for key in keys)
+    assert dur_lookup < dur_scan / 10
+
+
+def test_song_lookups(synthetic_root):
+    """Lookups of songs by id"""
+    cbdb = SongDB(synthetic_root, use_index=False)
+
+    assert cbdb["Composer_SongB"] is cbdb.songs[1]
+    with pytest.raises(KeyError):
+        cbdb["Composer_SongC"]
+
+
+def test_catalog(synthetic_root):
+    """Catalog holds one row per track and is cached"""
+    cbdb = SongDB(synthetic_root, use_index=False)
+    catalog = cbdb.catalog
+
+    assert catalog is cbdb.catalog
+    assert catalog.shape[0] == 12
+    assert len(cbdb.catalog_tracks) == 12
+    assert catalog.groupby("song_id").size().to_dict() == {"Composer_SongA": 7, "Composer_SongB": 5}
+    assert (catalog["instrument_type"] == "brass").sum() == 7
+    assert catalog["frames"].tolist() == [t.min_samples for t in cbdb.catalog_tracks]
+    assert catalog.loc[2, "path_audio"] == cbdb["Composer_SongA"][2].path_audio
+    assert catalog["duration"].iloc[0] == 1.0
+
+    frame = cbdb.to_frame()
+    frame.loc[0, "room"] = "changed"
+    assert cbdb.catalog.loc[0, "room"] != "changed"
+
+
+def test_select(synthetic_root):
+    """Filter the catalog by track attributes"""
+    cbdb = SongDB(synthetic_root, use_index=False)
+
+    tracks = cbdb.select(instrument_type=InstrumentType.WOODWIND, room="room_a")
+    assert sorted(t.instrument.value for t in tracks) == ["cl", "fl", "ts"]
+    assert all(t.voice % 2 == 1 for t in tracks)
+
+    tracks = cbdb.select(voice=[3, 4], instrument=Instrument.TUBA, sample_rate=8000)
+    assert [t.song_id for t in tracks] == ["Composer_SongA", "Composer_SongB"]
+
+    assert cbdb.query(song_id="Composer_SongB", voice=3).shape[0] == 2
+    assert cbdb.select(voice=5) == []
+
+    with pytest.raises(KeyError):
+        cbdb.select(color="red")
+
+
+def test_track_record():
+    """Tracks are immutable and convert to and from the pydantic model"""
+    track = Track(song_id="test_song_01", path_audio=Path("tp_1.wav"), voice=1, instrument="tp")
+
+    assert track.instrument == Instrument.TRUMPET
+    assert track.instrument_type == InstrumentType.BRASS
+    with pytest.raises(AttributeError):
+        track.voice = 2
+
+    model = track.to_model()
+    assert isinstance(model, TrackModel)
+    assert model.to_track() == track
+    assert Track.from_record(track.to_record()) == track
+
+
+def test_ensemble_random(mockupdb):
+    """Random ensembles select one track per voice without copying the song"""
+    song = mockupdb[0]
+
+    ensemble = EnsembleRandom(song, rng=np.random.default_rng(0))
+    tracks = ensemble.get_tracks()
+
+    assert ensemble.source_song is song
+    assert ensemble.song.tracks == tracks and len(ensemble.song) == 4
+    assert ensemble.song.id == song.id
+    assert [t.voice for t in tracks] == [1, 2, 3, 4]
+    assert all(t in song.tracks for t in tracks)
+
+    # same seed, same ensembles
+    rng_a, rng_b = np.random.default_rng(1), np.random.default_rng(1)
+    draws_a = [EnsembleRandom(song, rng=rng_a).track_choice_ids for _ in range(20)]
+    draws_b = [EnsembleRandom(song, rng=rng_b).track_choice_ids for _ in range(20)]
+    assert draws_a == draws_b
+    assert len(set(map(tuple, draws_a))) > 1
+
+
+def test_ensemble_permutations_indexing(mockupdb):
+    """Ensembles are decoded from the index in the order of the cartesian product"""
+    song = mockupdb[0]
+    ensembles = EnsemblePermutations(song)
+    expected = [
+        [song.tracks[i] for i in ids]
+        for ids in itertools.product(*[song.get_track_ids_by_voice(v) for v in song.voices])
+    ]
+
+    assert len(ensembles) == len(expected)
+    assert [ensembles[i] for i in range(len(ensembles))] == expected
+    assert list(ensembles) == expected
+    assert ensembles[-1] == expected[-1]
+    assert ensembles[1:6:2] == expected[1:6:2]
+    assert ensembles[::-1] == expected[::-1]
+
+    with pytest.raises(IndexError):
+        ensembles[len(expected)]
+    with pytest.raises(IndexError):
+        ensembles[-len(expected) - 1]
+
+
+@pytest.fixture
+def mockupdb_two_songs(mockupdb):
+    """Mockup database with a second song."""
+    song_02 = Song(Path("song_02"))
+    song_02.tracks = [
+        Track(song_id="test_song_02", path_audio=f"{inst.value}_{voice}.wav", voice=voice, instrument=inst)
+        for voice, inst in [(1, Instrument.TRUMPET), (1, Instrument.FLUTE), (2, Instrument.TRUMPET),
+                            (3, Instrument.TROMBONE), (3, Instrument.CLARINET), (4, Instrument.TUBA)]
+    ]
+    return mockupdb + [song_02]
+
+
+def test_ensemble_index(mockupdb_two_songs):
+    """Global ensemble index spanning all songs"""
+    index = EnsembleIndex(mockupdb_two_songs)
+    expected = [(song, ens) for song in mockupdb_two_songs for ens in EnsemblePermutations(song)]
+
+    assert len(index) == 8 + 4
+    assert list(index) == expected
+    assert index[-1] == expected[-1]
+    assert index.locate(8) == (1, 0)
+
+    with pytest.raises(IndexError):
+        index[len(expected)]
+
+
+def test_ensemble_index_filters(mockupdb_two_songs):
+    """Track and ensemble filters"""
+    index = EnsembleIndex(mockupdb_two_songs, track_filter=filter_instrument_type(InstrumentType.BRASS))
+    assert len(index) == 1 * 1 * 1 * 2 + 1 * 1 * 1 * 1
+    assert all(t.instrument_type == InstrumentType.BRASS for _, ens in index for t in ens)
+
+    index = EnsembleIndex(mockupdb_two_songs, ensemble_filter=no_repeated_instrument)
+    expected = [(song, ens) for song, ens in EnsembleIndex(mockupdb_two_songs) if no_repeated_instrument(ens)]
+    assert list(index) == expected
+
+
+def test_ensemble_index_sample(mockupdb_two_songs):
+    """Stratified sampling without replacement"""
+    index = EnsembleIndex(mockupdb_two_songs)
+
+    samples = index.sample(6, rng=np.random.default_rng(0))
+    assert len(set(samples.tolist())) == 6
+    # 8 and 4 ensembles per song -> 4 and 2 samples
+    assert sum(index.locate(int(i))[0] == 0 for i in samples) == 4
+
+    samples = index.sample(len(index), rng=np.random.default_rng(0), stratify=False)
+    assert sorted(samples.tolist()) == list(range(len(index)))
+
+    with pytest.raises(ValueError):
+        index.sample(len(index) + 1)
+
+
+def test_mixer_blockwise(synthetic_root, tmp_path):
+    """Block-wise mixing gives the same mix as mixing the full tracks"""
+    song = SongDB(synthetic_root, use_index=False)["Composer_SongA"]
+    tracks = EnsemblePermutations(song)[0]
+    mixer = MixerSimple(tracks, gains=[-3.0, 0.0, 2.0, 6.0])
+    mix = mixer.get_mix()["MIX"]
+
+    blocks = list(mixer.iter_mix(blocksize=3000))
+    assert [len(b) for b in blocks] == [3000, 3000, 2000]
+    np.testing.assert_allclose(np.concatenate(blocks), mix)
+
+    path_mix = tmp_path / "mix.wav"
+    assert mixer.write_mix(path_mix, blocksize=1024) == len(mix)
+    audio, sr = sf.read(path_mix)
+    assert sr == 8000
+    np.testing.assert_allclose(audio, mix, atol=1e-4)
+
+
+def test_mixer_excerpt(synthetic_root, tmp_path):
+    """Excerpts read only the requested frames"""
+    song = SongDB(synthetic_root, use_index=False)["Composer_SongA"]
+    mixer = MixerSimple(EnsemblePermutations(song)[3])
+    mix = mixer.get_mix()["MIX"]
+
+    np.testing.assert_allclose(mixer.get_mix(start=1000, duration=500, unit="samples")["MIX"], mix[1000:1500])
+    np.testing.assert_allclose(mixer.get_mix(start=0.5, duration=0.25)["MIX"], mix[4000:6000])
+    np.testing.assert_allclose(mixer.get_mix(start=0.5)["MIX"], mix[4000:])
+    np.testing.assert_allclose(np.concatenate(list(mixer.iter_mix(blocksize=300, start=0.5, duration=0.25))),
+                               mix[4000:6000])
+    np.testing.assert_allclose(np.concatenate(list(mixer.iter_mix(blocksize=300, start=7900, unit="samples"))),
+                               mix[7900:])
+
+    # measure positions via the naive alignment of sheet music and note annotations
+    path_sheet_music = tmp_path / "sheet_music.csv"
+    path_notes = tmp_path / "notes.csv"
+    pd.DataFrame({"start_meas": [1.0, 1.5, 2.0], "end_meas": [1.5, 2.0, 3.0], "pitch": [60, 62, 64],
+                  "part": ["S", "S", "S"]}).to_csv(path_sheet_music, sep=";", index=False)
+    pd.DataFrame({"TIME": [0.25, 0.5, 0.75], "VALUE": [261.6, 293.7, 329.6], "DURATION": [0.25, 0.25, 0.25],
+                  "LEVEL": [1, 1, 1], "LABEL": ["", "", ""]}).to_csv(path_notes, index=False)
+    tracks = list(mixer.tracks)
+    tracks[0] = dataclasses.replace(tracks[0], path_sheet_music_csv=path_sheet_music, path_notes=path_notes)
+
+    excerpt = MixerSimple(tracks).get_mix(start=1.5, duration=0.25, unit="measures")["MIX"]
+    np.testing.assert_allclose(excerpt, mix[4000:5000])
+
+
+def test_mixer_length_policy(synthetic_root):
+    """Tracks of different lengths are truncated or zero-padded"""
+    cbdb = SongDB(synthetic_root, use_index=False)
+    tracks = [cbdb["Composer_SongA"]["01_tp"], cbdb["Composer_SongB"]["02_tp"]]
+    audio = [sf.read(t.path_audio, dtype="float32")[0] for t in tracks]
+    assert [len(a) for a in audio] == [8000, 8100]
+
+    result = MixerSimple(tracks).get_mix()
+    assert result["MIX"].dtype == np.float32
+    assert result["TRACKS"].shape == (2, 8000)
+    np.testing.assert_allclose(result["MIX"], (audio[0] + audio[1][:8000]) / 2, atol=1e-6)
+
+    mixer = MixerSimple(tracks, length="longest")
+    mix = mixer.get_mix(return_tracks=False)["MIX"]
+    assert len(mix) == 8100
+    np.testing.assert_allclose(mix[8000:], audio[1][8000:] / 2, atol=1e-6)
+    np.testing.assert_allclose(np.concatenate(list(mixer.iter_mix(blocksize=3000))), mix)
+
+    with pytest.raises(ValueError):
+        MixerSimple(tracks, length="median")
+
+
+def test_audio_dtype(synthetic_root):
+    """Tracks load as float32 by default, integer types pass the PCM samples through"""
+    track = SongDB(synthetic_root, use_index=False)["Composer_SongA"]["01_tp"]
+
+    audio = track.audio()
+    assert audio.dtype == np.float32 and audio.shape == (8000,)
+    audio_int16 = track.audio(dtype="int16")
+    assert audio_int16.dtype == np.int16
+    np.testing.assert_array_equal(audio_int16 / 2 ** 15, audio)
+    np.testing.assert_array_equal(track.audio(start=100, frames=10, dtype="float64"), audio[100:110])
+
+    tracks = EnsemblePermutations(SongDB(synthetic_root, use_index=False)["Composer_SongA"])[0]
+    mix_32 = MixerSimple(tracks).get_mix()["MIX"]
+    mix_64 = MixerSimple(tracks, dtype="float64").get_mix()["MIX"]
+    assert mix_64.dtype == np.float64
+    np.testing.assert_allclose(mix_32, mix_64, atol=1e-6)
+
+    with pytest.raises(ValueError):
+        MixerSimple(tracks, dtype="int16")
+
+
+def test_mixer_batch(synthetic_root):
+    """Batched mixes equal individual mixes"""
+    tracks = EnsemblePermutations(SongDB(synthetic_root, use_index=False)["Composer_SongA"])[5]
+    gains = np.random.default_rng(0).uniform(-6, 6, size=(8, 4))
+    mixer = MixerBatch(tracks)
+
+    mixes = mixer.get_mixes(gains)
+    assert mixes.shape == (8, 8000) and mixes.dtype == np.float32
+    for cur_gains, cur_mix in zip(gains, mixes):
+        np.testing.assert_allclose(cur_mix, MixerSimple(tracks, gains=cur_gains).get_mix()["MIX"], atol=1e-6)
+
+    # tracks are read only once per excerpt
+    assert mixer.load_tracks() is mixer.load_tracks()
+    np.testing.assert_allclose(mixer.get_mixes(gains, start=0.5, duration=0.25), mixes[:, 4000:6000], atol=1e-6)
+
+    # gain envelopes, shared and per mix
+    fade_in = np.broadcast_to(np.linspace(0, 1, 8000), (4, 8000))
+    mixes_fade = mixer.get_mixes(gains, envelopes=fade_in)
+    np.testing.assert_allclose(mixes_fade, mixes * np.linspace(0, 1, 8000), atol=1e-6)
+    mixes_fade = mixer.get_mixes(gains, envelopes=np.broadcast_to(fade_in, (8, 4, 8000)))
+    np.testing.assert_allclose(mixes_fade, mixes * np.linspace(0, 1, 8000), atol=1e-6)
+
+    with pytest.raises(ValueError):
+        mixer.get_mixes(gains[:, :3])
+
+
+def test_mixer_resampling(synthetic_root):
+    """Tracks are resampled to the target sample rate"""
+    tracks = EnsemblePermutations(SongDB(synthetic_root, use_index=False)["Composer_SongA"])[0]
+    audio = [resample(cur_track.audio(), 8000, 16000) for cur_track in tracks]
+
+    np.testing.assert_array_equal(tracks[0].audio(target_sr=16000), audio[0])
+    np.testing.assert_array_equal(tracks[0].audio(target_sr=8000), tracks[0].audio())
+    with pytest.raises(ValueError):
+        tracks[0].audio(dtype="int16", target_sr=16000)
+
+    mixer = MixerSimple(tracks, target_sr=16000)
+    result = mixer.get_mix()
+    assert result["SAMPLERATE"] == 16000 and result["MIX"].shape == (16000,)
+    np.testing.assert_allclose(result["MIX"], np.mean(audio, axis=0), atol=1e-6)
+    np.testing.assert_allclose(np.concatenate(list(mixer.iter_mix(blocksize=3000))), result["MIX"])
+
+    # excerpts in seconds refer to the target rate
+    excerpt = mixer.get_mix(start=0.25, duration=0.5)["MIX"]
+    assert excerpt.shape == (8000,)
+    np.testing.assert_allclose(excerpt, result["MIX"][4000:12000], atol=1e-6)
+
+    mixes = MixerBatch(tracks, target_sr=16000).get_mixes(np.zeros((2, 4)))
+    np.testing.assert_allclose(mixes[0], result["MIX"], atol=1e-6)
+
+
+def test_mixer_resampling_blockwise(synthetic_root_44k, tmp_path):
+    """Block-wise mixing resamples per block and equals the mix computed at once"""
+    tracks = EnsemblePermutations(SongDB(synthetic_root_44k, use_index=False)["Composer_SongA"])[0]
+    mixer = MixerSimple(tracks, target_sr=16000)
+    mix = mixer.get_mix(return_tracks=False)["MIX"]
+
+    blocks = list(mixer.iter_mix(blocksize=1000))
+    assert max(len(cur_block) for cur_block in blocks) == 1000
+    np.testing.assert_allclose(np.concatenate(blocks), mix, atol=1e-6)
+
+    excerpt = np.concatenate(list(mixer.iter_mix(blocksize=1000, start=12345, duration=4000, unit="samples")))
+    np.testing.assert_allclose(excerpt, mix[12345:16345], atol=1e-6)
+
+    assert mixer.write_mix(tmp_path / "mix.wav", blocksize=1000) == len(mix)
+    np.testing.assert_allclose(sf.read(tmp_path / "mix.wav", dtype="float32")[0], mix, atol=1e-4)
@@ -0,0 +1,75 @@
+"""
+All tests related to the persistent dataset index.
+"""
+import json
+import os
+
+from choralebricks import dataset
+from choralebricks.dataset import SongDB
+from choralebricks.index import INDEX_VERSION, default_index_path
+
+_sf_info = dataset.sf.info
+
+
+def _fail_probe(*args, **kwargs):
+    raise AssertionError("Audio file was probed although the index is valid.")
+
+
+def test_index_written(synthetic_root):
+    """First construction scans the dataset and writes the index"""
+    cbdb = SongDB(synthetic_root)
+    path_index = default_index_path(synthetic_root)
+
+    assert path_index.is_file()
+    content = json.loads(path_index.read_text())
+    assert content["version"] == INDEX_VERSION
+    assert len(content["songs"]) == len(cbdb)
+
+
+def test_index_roundtrip(synthetic_root, monkeypatch):
+    """Warm construction restores identical songs and tracks without probing audio files"""
+    cbdb_cold = SongDB(synthetic_root)
+
+    monkeypatch.setattr(dataset.sf, "info", _fail_probe)
+    cbdb_warm = SongDB(synthetic_root)
+
+    assert [s.id for s in cbdb_warm.songs] == [s.id for s in cbdb_cold.songs]
+    for cur_song_cold, cur_song_warm in zip(cbdb_cold.songs, cbdb_warm.songs):
+        assert cur_song_warm.year == cur_song_cold.year
+        assert cur_song_warm.tracks == cur_song_cold.tracks
+
+
+def test_index_invalidated_by_audio_change(synthetic_root, monkeypatch):
+    """Changing an audio file invalidates the index"""
+    cbdb = SongDB(synthetic_root)
+    path_audio = cbdb[0][0].path_audio
+    stat = path_audio.stat()
+    os.utime(path_audio, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    probed = []
+    monkeypatch.setattr(dataset.sf, "info", lambda path: probed.append(path) or _sf_info(path))
+    SongDB(synthetic_root)
+
+    assert len(probed) > 0
+
+
+def test_index_invalidated_by_checksum(synthetic_root, monkeypatch):
+    """A tampered index is ignored"""
+    SongDB(synthetic_root)
+    path_index = default_index_path(synthetic_root)
+    content = json.loads(path_index.read_text())
+    content["songs"][0]["title"] = "Tampered"
+    path_index.write_text(json.dumps(content))
+
+    cbdb = SongDB(synthetic_root)
+
+    assert cbdb[0].title != "Tampered"
+
+
+def test_index_disabled(synthetic_root, tmp_path):
+    """No index is written if disabled"""
+    path_index = tmp_path / "index.json"
+    SongDB(synthetic_root, use_index=False, index_path=path_index)
+
+    assert not path_index.exists()
+
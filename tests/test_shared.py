@@ -0,0 +1,109 @@
+"""
+All tests related to the shared-memory dataset mode.
+"""
+import multiprocessing
+import subprocess
+import sys
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from choralebricks import dataset
+from choralebricks.dataset import SongDB
+from choralebricks.shared import SharedSongDB, attach, detach
+
+
+def _fail_probe(*args, **kwargs):
+    raise AssertionError("Audio file was probed although the dataset is shared.")
+
+
+def _worker_checksum(name: str) -> list[float]:
+    cbdb = attach(name)
+    checksums = [float(cur_track.audio(mmap=True).sum()) for cur_track in cbdb.catalog_tracks]
+    detach()
+    return checksums
+
+
+def test_shared_catalog(synthetic_root, monkeypatch):
+    """Attached datasets equal the shared one without scanning"""
+    cbdb = SongDB(synthetic_root, use_index=False)
+
+    with SharedSongDB(cbdb) as shared:
+        monkeypatch.setattr(dataset.sf, "info", _fail_probe)
+        cbdb_attached = attach(shared.name)
+
+        assert [s.id for s in cbdb_attached.songs] == [s.id for s in cbdb.songs]
+        for cur_song, cur_song_attached in zip(cbdb.songs, cbdb_attached.songs):
+            assert cur_song_attached.tracks == cur_song.tracks
+
+        with pytest.raises(RuntimeError):
+            cbdb_attached[0][0].audio(mmap=True)
+
+
+def test_shared_audio(synthetic_root):
+    """Tracks resolve to read-only views into the shared audio, also in worker processes"""
+    cbdb = SongDB(synthetic_root, use_index=False)
+    tracks = cbdb.catalog_tracks
+
+    with SharedSongDB(cbdb, audio=True) as shared:
+        cbdb_attached = attach(shared.name)
+        for cur_track in cbdb_attached.catalog_tracks:
+            audio = cur_track.audio(mmap=True)
+            assert not audio.flags.writeable
+            np.testing.assert_array_equal(audio, cur_track.audio())
+        del audio
+        detach()
+
+        with multiprocessing.get_context("fork").Pool(2) as pool:
+            checksums = pool.map(_worker_checksum, [shared.name] * 2)
+
+    expected = [float(cur_track.audio().sum()) for cur_track in tracks]
+    assert checksums == [expected, expected]
+
+
+def test_shared_audio_spawn(synthetic_root):
+    """Spawned workers share the resource tracker of the owner and leave its registration intact"""
+    # run in a separate interpreter to capture the output of its resource tracker
+    code = ("import multiprocessing, sys; "
+            "from choralebricks.dataset import SongDB; "
+            "from choralebricks.shared import SharedSongDB; "
+            "from tests.test_shared import _worker_checksum; "
+            "shared = SharedSongDB(SongDB(sys.argv[1], use_index=False), audio=True); "
+            "pool = multiprocessing.get_context('spawn').Pool(2); "
+            "checksums = pool.map(_worker_checksum, [shared.name] * 2); "
+            "pool.close(); pool.join(); "
+            "assert checksums[0] == checksums[1] and len(checksums[0]) == 12; "
+            "shared.close(); "
+            "print(shared.name)")
+    result = subprocess.run([sys.executable, "-c", code, str(synthetic_root)], capture_output=True, text=True,
+                            cwd=Path(__file__).parents[1], check=True)
+
+    assert "KeyError" not in result.stderr and "leaked" not in result.stderr
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=result.stdout.strip())
+
+
+def test_shared_close_twice(synthetic_root):
+    """Closing again, also after the context manager, has no effect"""
+    cbdb = SongDB(synthetic_root, use_index=False)
+
+    shared = SharedSongDB(cbdb, audio=True)
+    shared.close()
+    shared.close()
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=shared.name)
+
+    with SharedSongDB(cbdb) as shared:
+        shared.close()
+
+
+@pytest.mark.skipif(sys.version_info >= (3, 13) or sys.platform == "win32",
+                    reason="segments are attached untracked")
+def test_shared_unknown_tracker(synthetic_root, monkeypatch):
+    """Without a way to identify the resource tracker, sharing fails instead of dropping registrations"""
+    monkeypatch.setattr("choralebricks.shared.resource_tracker._resource_tracker", object())
+
+    with pytest.raises(RuntimeError):
+        SharedSongDB(SongDB(synthetic_root, use_index=False))
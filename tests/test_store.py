@@ -0,0 +1,81 @@
+"""
+All tests related to the memory-mapped audio store.
+"""
+import numpy as np
+import pytest
+import soundfile as sf
+
+from choralebricks import dataset, store
+from choralebricks.dataset import EnsemblePermutations, MixerBatch, MixerSimple, SongDB
+from choralebricks.store import AudioStore, build_store, open_store
+
+
+@pytest.fixture
+def opened_store():
+    """Closes the opened store after the test."""
+    yield
+    store.close_store()
+
+
+def test_store_roundtrip(synthetic_root, tmp_path, opened_store):
+    """Memory-mapped tracks equal the decoded files"""
+    cbdb = SongDB(synthetic_root, use_index=False)
+    tracks = [cur_track for cur_song in cbdb.songs for cur_track in cur_song.tracks]
+
+    with pytest.raises(RuntimeError):
+        tracks[0].audio(mmap=True)
+
+    audio_store = open_store(build_store(cbdb, tmp_path / "store"))
+    assert len(audio_store) == len(tracks)
+    assert all(cur_track in audio_store for cur_track in tracks)
+
+    for cur_track in tracks:
+        audio = cur_track.audio(mmap=True)
+        assert isinstance(audio, np.memmap) and not audio.flags.writeable
+        np.testing.assert_array_equal(audio, cur_track.audio())
+
+    excerpt = tracks[0].audio(start=100, frames=10, mmap=True)
+    assert np.shares_memory(excerpt, audio_store.audio)
+    np.testing.assert_array_equal(excerpt, tracks[0].audio(start=100, frames=10))
+
+    with pytest.raises(ValueError):
+        tracks[0].audio(dtype="int16", mmap=True)
+
+
+def test_store_int16(synthetic_root, tmp_path, opened_store):
+    """PCM samples are stored without conversion"""
+    cbdb = SongDB(synthetic_root, use_index=False)
+    track = cbdb["Composer_SongB"]["02_tp"]
+
+    open_store(build_store(cbdb, tmp_path / "store", dtype="int16"))
+
+    audio = track.audio(dtype="int16", mmap=True)
+    assert audio.dtype == np.int16 and audio.shape == (8100,)
+    np.testing.assert_array_equal(audio, sf.read(track.path_audio, dtype="int16")[0])
+
+    # the store can be reopened independently of the dataset
+    assert len(AudioStore.load(tmp_path / "store")) == len(cbdb.catalog)
+
+    with pytest.raises(ValueError):
+        build_store(cbdb, tmp_path / "store", dtype="int8")
+
+
+def _fail_decode(*args, **kwargs):
+    raise AssertionError("Audio file was decoded although the track is in the store.")
+
+
+@pytest.mark.parametrize("dtype", ["float32", "int16"])
+def test_store_used_by_mixer(synthetic_root, tmp_path, opened_store, monkeypatch, dtype):
+    """Mixers read the tracks from the opened store"""
+    cbdb = SongDB(synthetic_root, use_index=False)
+    tracks = EnsemblePermutations(cbdb["Composer_SongA"])[0]
+    mix = MixerSimple(tracks).get_mix(start=100, duration=1000, unit="samples")["MIX"]
+    track_audio = MixerBatch(tracks).load_tracks()
+
+    open_store(build_store(cbdb, tmp_path / "store", dtype=dtype))
+    monkeypatch.setattr(dataset.sf, "SoundFile", _fail_decode)
+
+    np.testing.assert_array_equal(MixerSimple(tracks).get_mix(start=100, duration=1000, unit="samples")["MIX"], mix)
+    np.testing.assert_array_equal(MixerBatch(tracks).load_tracks(), track_audio)
+    blocks = MixerSimple(tracks).iter_mix(blocksize=300, start=100, duration=1000, unit="samples")
+    np.testing.assert_array_equal(np.concatenate(list(blocks)), mix)